@@ -0,0 +1,105 @@
+"""Time the module.02 report plots under the old and the RenderContext pipelines.
+
+legacy reproduces the previous per-plot path: sns.set and plt.subplots for
+every plot, tight_layout, and savefig with Pillow's default PNG compression.
+The other configurations draw through RenderContext with a reused canvas and
+fixed margins, writing PNG (compress level 1), WebP or SVG. Each plot is
+rendered --repeat times into a temporary directory; the report gives the
+median time per plot and the output size.
+
+Usage:
+    python module.02/bench_plots.py --repeat 5
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import argparse
+import statistics
+import tempfile
+import time
+from contextlib import closing
+from dataclasses import replace
+from typing import Optional
+
+import figure_cache
+from figure_cache import FigureJob, RenderContext, set_render_context
+import spacex_eda_sql
+import spacex_dataviz
+from success_trend import refresh_success_trend, yearly_success
+
+
+class LegacyContext(RenderContext):
+    # The pre-RenderContext path: theme, pyplot figure and layout solve per plot
+    def __init__(self, style: str = 'whitegrid'):
+        super().__init__(style, reuse=False, tight_layout=True, png_compress_level=6)
+
+    def figure(self, figsize, margins=None):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        sns.set(style=self.style)
+        return plt.subplots(figsize=figsize)
+
+    def save(self, fig, path, dpi, margins=None):
+        import matplotlib.pyplot as plt
+        fig.tight_layout()
+        fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+
+
+CONFIGS = {
+    'legacy-png': (LegacyContext, 'png'),
+    'context-png': (RenderContext, 'png'),
+    'context-webp': (RenderContext, 'webp'),
+    'context-svg': (RenderContext, 'svg'),
+}
+
+
+def report_jobs() -> list[FigureJob]:
+    """The six report plots with their real inputs, as the two scripts build them."""
+    api_df, scraped_df = spacex_eda_sql.read_data()
+    merged = spacex_eda_sql.merge_data(api_df, scraped_df)
+    with closing(sqlite3.connect(':memory:')) as conn:
+        spacex_eda_sql.save_sql_tables(conn, merged, api_df, scraped_df)
+        refresh_success_trend(conn)
+        yearly = yearly_success(conn)
+    df, _ = spacex_dataviz.load_dataset()
+    return (spacex_eda_sql.plot_jobs(merged, yearly)
+            + spacex_dataviz.relationship_jobs(df)
+            + [spacex_dataviz.success_trend_job(df)])
+
+
+def bench(jobs: list[FigureJob], config: str, out_dir: str, repeat: int) -> None:
+    context_cls, fmt = CONFIGS[config]
+    set_render_context(context_cls())
+    print(f'=== {config}')
+    total = 0.0
+    for job in jobs:
+        name = os.path.splitext(os.path.basename(job.path))[0]
+        path = figure_cache.plot_path(out_dir, name, fmt)
+        job = replace(job, path=path)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            job.render(job.data, job.path, job.params)
+            timings.append(time.perf_counter() - start)
+        median_ms = statistics.median(timings) * 1000
+        total += median_ms
+        print(f'{name:28s} median {median_ms:8.1f} ms   {os.path.getsize(path) / 1024:8.1f} KiB')
+    print(f'{"total":28s} median {total:8.1f} ms\n')
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='renders per plot')
+    parser.add_argument('--config', action='append', choices=list(CONFIGS),
+                        help='configuration to run (repeatable; default: all)')
+    args = parser.parse_args(argv)
+
+    jobs = report_jobs()
+    with tempfile.TemporaryDirectory() as tmp:
+        for config in args.config or list(CONFIGS):
+            bench(jobs, config, tmp, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""One-hot encoding with a persisted category vocabulary.
+
+CategoryEncoder learns the categories of each column once and saves them as
+JSON next to the features file. Any later chunk, such as new launches or one
+slice of a larger file, is encoded into the same column layout as
+pd.get_dummies on the fitted data: passthrough columns first, then
+`<col>_<category>` per categorical column in sorted order. Each categorical
+column also gets a `<col>__unknown` bucket for values outside the vocabulary.
+Missing values encode as all zeros, as with get_dummies.
+
+HashingEncoder is the fixed-width alternative for high-cardinality columns
+like Serial and LandingPad. Each value goes to one of n_buckets columns by a
+stable hash, so the width and memory do not grow with new boosters.
+When some columns are hashed, the vocabulary file also records which ones
+and n_buckets, so a reloaded encoder reproduces the same layout.
+"""
+from __future__ import annotations
+import json
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from sparse_features import sparse_column
+
+UNKNOWN_SUFFIX = '__unknown'
+
+
+def _one_hot(codes: np.ndarray, names: list[str], sparse: bool) -> dict[str, object]:
+    """Indicator columns for `codes` (position in `names`, -1 for none)."""
+    n, width = len(codes), len(names)
+    out: dict[str, object] = {}
+    if sparse:
+        # Group row positions by code once instead of one comparison per column
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(width + 1))
+        ones = np.ones(n, dtype=np.uint8)
+        for j, name in enumerate(names):
+            lo, hi = bounds[j], bounds[j + 1]
+            out[name] = sparse_column(ones[lo:hi], order[lo:hi], n)
+    else:
+        block = np.zeros((n, width), dtype=np.uint8)
+        hit = codes >= 0
+        block[np.flatnonzero(hit), codes[hit]] = 1
+        for j, name in enumerate(names):
+            out[name] = block[:, j]
+    return out
+
+
+class CategoryEncoder:
+    def __init__(self, categorical: list[str], passthrough: Optional[list[str]] = None,
+                 vocab: Optional[dict[str, list[str]]] = None, hashed: Optional[list[str]] = None,
+                 n_buckets: Optional[int] = None):
+        self.categorical = list(categorical)
+        self.passthrough = list(passthrough or [])
+        self.vocab: dict[str, list[str]] = {c: list(v) for c, v in (vocab or {}).items()}
+        # Columns encoded by a HashingEncoder alongside this one, and its width
+        self.hashed = list(hashed or [])
+        self.n_buckets = n_buckets if self.hashed else None
+
+    def fit(self, df: pd.DataFrame) -> 'CategoryEncoder':
+        self.passthrough = [c for c in df.columns if c not in self.categorical]
+        for col in self.categorical:
+            values = df[col].dropna().astype(str).unique()
+            self.vocab[col] = sorted(values.tolist())
+        return self
+
+    @property
+    def feature_names(self) -> list[str]:
+        names = list(self.passthrough)
+        for col in self.categorical:
+            names.extend(f'{col}_{v}' for v in self.vocab[col])
+            names.append(f'{col}{UNKNOWN_SUFFIX}')
+        return names
+
+    def _codes(self, values: pd.Series) -> np.ndarray:
+        # Vocabulary position per row; len(vocab) marks unknown, -1 marks missing
+        vocab = self.vocab[values.name]
+        missing = values.isna().to_numpy()
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            values = values.astype(str)
+        codes = pd.Index(vocab).get_indexer(values).astype(np.int64)
+        codes[(codes < 0) & ~missing] = len(vocab)
+        codes[missing] = -1
+        return codes
+
+    def transform(self, chunk: pd.DataFrame, sparse: bool = False) -> pd.DataFrame:
+        out: dict[str, object] = {c: chunk[c].to_numpy() for c in self.passthrough}
+        for col in self.categorical:
+            names = [f'{col}_{v}' for v in self.vocab[col]] + [f'{col}{UNKNOWN_SUFFIX}']
+            out.update(_one_hot(self._codes(chunk[col]), names, sparse))
+        return pd.DataFrame(out, index=chunk.index)
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame], sparse: bool = False) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.transform(chunk, sparse=sparse)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'categorical': self.categorical, 'passthrough': self.passthrough, 'vocab': self.vocab,
+                       'hashed': self.hashed, 'n_buckets': self.n_buckets}, f, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> 'CategoryEncoder':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['categorical'], data.get('passthrough'), data['vocab'],
+                   data.get('hashed'), data.get('n_buckets'))
+
+
+class HashingEncoder:
+    def __init__(self, columns: list[str], n_buckets: int = 64):
+        if n_buckets < 1:
+            raise ValueError('n_buckets must be at least 1')
+        self.columns = list(columns)
+        self.n_buckets = n_buckets
+
+    @property
+    def feature_names(self) -> list[str]:
+        return [f'{col}_hash_{i}' for col in self.columns for i in range(self.n_buckets)]
+
+    def _codes(self, values: pd.Series) -> np.ndarray:
+        # pandas' hash_array uses a fixed key, so buckets are stable across runs
+        missing = values.isna().to_numpy()
+        hashed = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        codes = (hashed % np.uint64(self.n_buckets)).astype(np.int64)
+        codes[missing] = -1
+        return codes
+
+    def transform(self, chunk: pd.DataFrame, sparse: bool = True) -> pd.DataFrame:
+        out: dict[str, object] = {}
+        for col in self.columns:
+            names = [f'{col}_hash_{i}' for i in range(self.n_buckets)]
+            out.update(_one_hot(self._codes(chunk[col]), names, sparse))
+        return pd.DataFrame(out, index=chunk.index)
@@ -0,0 +1,229 @@
+"""Content-hashed, parallel figure rendering for the module.02 report scripts.
+
+A plot is described by a FigureJob: the output path, a module-level render
+function, the input columns it reads, its style parameters and the modules
+of any helpers it calls outside its own module. The job hash covers all of
+these, the source of the render function's module, of this module
+(RenderContext) and the encoder settings;
+when the PNG exists and its hash matches the one recorded
+in the plots manifest the job is skipped. Stale jobs are rendered in a process
+pool on the Agg backend.
+
+Render functions draw through a per-process RenderContext, which sets the
+seaborn theme and the Agg backend once, reuses one Agg canvas per figure size,
+places axes with fixed margins instead of solving tight_layout, and picks
+the encoder from the file extension (fast-compression PNG, WebP or SVG).
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from types import CodeType
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+MANIFEST_NAME = '.figure_cache.json'
+FORMATS = ('png', 'webp', 'svg')
+PNG_COMPRESS_LEVEL = 1
+WEBP_QUALITY = 90
+
+RenderFn = Callable[[pd.DataFrame, str, dict], None]
+
+
+@dataclass(frozen=True)
+class FigureJob:
+    path: str
+    render: RenderFn
+    data: pd.DataFrame
+    params: dict[str, Any] = field(default_factory=dict)
+    # Modules (by name) of helpers the renderer calls outside its own module
+    deps: tuple[str, ...] = ()
+
+
+def _code_fingerprint(code: CodeType, h: Any) -> None:
+    # Hash the render function body so editing a plot invalidates its PNG.
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _code_fingerprint(const, h)
+        else:
+            h.update(repr(const).encode('utf-8'))
+    h.update(repr(code.co_names).encode('utf-8'))
+
+
+def _module_fingerprint(name: str, h: Any) -> None:
+    # Helpers and constants the renderer uses live in its module; hash the whole source
+    path = getattr(sys.modules.get(name), '__file__', None)
+    if path is None:
+        __import__(name)
+        path = getattr(sys.modules[name], '__file__', None)
+    h.update(name.encode('utf-8'))
+    if path:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+
+
+def _encoder_settings(style: str) -> list:
+    ctx = _contexts.get(style)
+    if ctx is None:
+        return [PNG_COMPRESS_LEVEL, WEBP_QUALITY]
+    return [ctx.png_compress_level, ctx.webp_quality]
+
+
+def job_hash(job: FigureJob) -> str:
+    h = hashlib.sha256()
+    h.update(f'{job.render.__module__}.{job.render.__qualname__}'.encode('utf-8'))
+    _code_fingerprint(job.render.__code__, h)
+    # This module too: RenderContext's layout, canvas reuse and encoder calls shape every PNG
+    for name in (__name__, job.render.__module__, *job.deps):
+        _module_fingerprint(name, h)
+    h.update(json.dumps(_encoder_settings(job.params.get('style', 'whitegrid'))).encode('utf-8'))
+    h.update(json.dumps(job.params, sort_keys=True, default=str).encode('utf-8'))
+    h.update(json.dumps([[str(c), str(t)] for c, t in job.data.dtypes.items()]).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(job.data, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _manifest_path(plot_dir: str) -> str:
+    return os.path.join(plot_dir, MANIFEST_NAME)
+
+
+def load_manifest(plot_dir: str) -> dict[str, str]:
+    try:
+        with open(_manifest_path(plot_dir), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_manifest(plot_dir: str, manifest: dict[str, str]) -> None:
+    path = _manifest_path(plot_dir)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class RenderContext:
+    def __init__(self, style: str = 'whitegrid', reuse: bool = True, tight_layout: bool = False,
+                 png_compress_level: int = PNG_COMPRESS_LEVEL, webp_quality: int = WEBP_QUALITY):
+        import matplotlib
+        matplotlib.use('Agg')
+        import seaborn as sns
+        sns.set_theme(style=style)
+        self.style = style
+        self.reuse = reuse
+        self.tight_layout = tight_layout
+        self.png_compress_level = png_compress_level
+        self.webp_quality = webp_quality
+        self._figures: dict[tuple[float, float], Any] = {}
+
+    def figure(self, figsize: tuple[float, float], margins: Optional[dict[str, float]] = None):
+        """Return a cleared (fig, ax) of `figsize`, reusing this size's canvas."""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        key = (float(figsize[0]), float(figsize[1]))
+        fig = self._figures.get(key) if self.reuse else None
+        if fig is None:
+            fig = Figure(figsize=key)
+            FigureCanvasAgg(fig)
+            if self.reuse:
+                self._figures[key] = fig
+        else:
+            fig.clear()
+        ax = fig.add_subplot()
+        if margins and not self.tight_layout:
+            fig.subplots_adjust(**margins)
+        return fig, ax
+
+    def save(self, fig, path: str, dpi: int, margins: Optional[dict[str, float]] = None) -> None:
+        if self.tight_layout or not margins:
+            fig.tight_layout()
+        ext = os.path.splitext(path)[1].lower().lstrip('.')
+        if ext == 'png':
+            fig.savefig(path, dpi=dpi, pil_kwargs={'compress_level': self.png_compress_level})
+        elif ext == 'webp':
+            fig.savefig(path, dpi=dpi, pil_kwargs={'quality': self.webp_quality, 'method': 0})
+        else:
+            fig.savefig(path, dpi=dpi)
+        if not self.reuse:
+            fig.clear()
+
+
+_contexts: dict[str, RenderContext] = {}
+_active_style: Optional[str] = None
+
+
+def render_context(style: str = 'whitegrid') -> RenderContext:
+    """The process-wide context for `style`; the theme is re-applied only when the style changes."""
+    global _active_style
+    ctx = _contexts.get(style)
+    if ctx is None:
+        ctx = _contexts[style] = RenderContext(style)
+    elif _active_style != style:
+        import seaborn as sns
+        sns.set_theme(style=style)
+    _active_style = style
+    return ctx
+
+
+def set_render_context(ctx: RenderContext) -> None:
+    """Use `ctx` for its style in this process (benchmarks swap encoder and layout settings)."""
+    global _active_style
+    _contexts[ctx.style] = ctx
+    _active_style = None
+
+
+def plot_path(plot_dir: str, name: str, fmt: str = 'png') -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported plot format {fmt!r}; expected one of {FORMATS}")
+    return os.path.join(plot_dir, f'{name}.{fmt}')
+
+
+def _init_worker() -> None:
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(job: FigureJob) -> str:
+    job.render(job.data, job.path, job.params)
+    return job.path
+
+
+def render_figures(jobs: list[FigureJob], workers: Optional[int] = None, force: bool = False) -> list[str]:
+    """Render the stale jobs and return every job's output path, in job order."""
+    manifests: dict[str, dict[str, str]] = {}
+    stale: list[tuple[FigureJob, str]] = []
+    for job in jobs:
+        plot_dir = os.path.dirname(job.path) or '.'
+        manifest = manifests.setdefault(plot_dir, load_manifest(plot_dir))
+        digest = job_hash(job)
+        if force or not os.path.exists(job.path) or manifest.get(os.path.basename(job.path)) != digest:
+            stale.append((job, digest))
+
+    if not stale:
+        return [job.path for job in jobs]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(stale)))
+    if workers == 1:
+        # Not worth a pool spin-up for a single plot
+        _init_worker()
+        for job, _ in stale:
+            _render(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            list(pool.map(_render, [job for job, _ in stale]))
+
+    for job, digest in stale:
+        plot_dir = os.path.dirname(job.path) or '.'
+        manifests[plot_dir][os.path.basename(job.path)] = digest
+    for plot_dir, manifest in manifests.items():
+        save_manifest(plot_dir, manifest)
+    return [job.path for job in jobs]
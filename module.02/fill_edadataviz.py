@@ -1,9 +1,13 @@
-import nbformat
-from nbformat.v4 import new_code_cell
 from pathlib import Path
 import sys
 
-NOTEBOOK_PATH = Path(__file__).resolve().parents[1] / "module.02" / "edadataviz.ipynb"
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+from notebook_patch import NotebookPatcher, Rule, format_report
+
+NOTEBOOK_PATH = REPO_ROOT / "module.02" / "edadataviz.ipynb"
+# The only notebook these rules are written for (see tools/notebook_patch.py)
+NOTEBOOKS = (NOTEBOOK_PATH.relative_to(REPO_ROOT).as_posix(),)
 
 # Map placeholders to code we want to inject
 REPLACEMENTS = {
@@ -69,6 +73,10 @@ REPLACEMENTS = {
 # Replacement for JupyterLite-specific data loading cell
 LITE_FETCH_SNIPPET = "from js import fetch"
 LITE_INSTALL_SNIPPET = "import piplite"
+LITE_INSTALL_REPLACEMENT = (
+    "# JupyterLite install step removed for local execution\n"
+    "# Requirements handled by environment (requirements.txt)\n"
+)
 
 DATA_LOAD_REPLACEMENT = (
     "import os\n"
@@ -91,38 +99,26 @@ DATA_LOAD_REPLACEMENT = (
 )
 
 
-def patch_notebook(path: Path) -> bool:
-    nb = nbformat.read(path, as_version=4)
-    changed = False
-
-    for cell in nb.cells:
-        if cell.cell_type != 'code':
-            continue
-        src = cell.source or ''
-
-        # Replace JupyterLite installs with a no-op comment
-        if LITE_INSTALL_SNIPPET in src:
-            cell.source = "# JupyterLite install step removed for local execution\n# Requirements handled by environment (requirements.txt)\n"
-            changed = True
-            continue
-
-        # Replace JupyterLite fetch with robust pandas read_csv
-        if LITE_FETCH_SNIPPET in src:
-            # Keep imports that may be present earlier in notebook; here we only handle data loading.
-            cell.source = DATA_LOAD_REPLACEMENT
-            changed = True
-            continue
+# Checked in order; the first rule matching a cell wins
+RULES = [
+    # Replace JupyterLite installs with a no-op comment
+    Rule("remove JupyterLite install", (LITE_INSTALL_SNIPPET,), LITE_INSTALL_REPLACEMENT),
+    # Replace JupyterLite fetch with robust pandas read_csv
+    Rule("replace JupyterLite fetch", (LITE_FETCH_SNIPPET,), DATA_LOAD_REPLACEMENT),
+    # Fill TASK placeholders
+    *(Rule(f"TASK {i}", (placeholder,), replacement, mode="prefix")
+      for i, (placeholder, replacement) in enumerate(REPLACEMENTS.items(), 1)),
+]
 
-        # Fill TASK placeholders
-        for placeholder, replacement in REPLACEMENTS.items():
-            if src.strip().startswith(placeholder):
-                cell.source = replacement
-                changed = True
-                break
 
-    if changed:
-        nbformat.write(nb, path)
-    return changed
+def patch_notebook(path: Path) -> bool:
+    results = NotebookPatcher(RULES).patch_many([path])
+    if not results:
+        # patch_many already reported why the notebook was skipped
+        return False
+    for line in format_report(results):
+        print(line)
+    return results[0].changed
 
 
 def main():
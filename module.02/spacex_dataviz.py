@@ -1,11 +1,21 @@
 import os
 import io
+import sqlite3
+import argparse
 import datetime
+from contextlib import closing
+from typing import Optional
 import requests
 import pandas as pd
 import numpy as np
 import seaborn as sns
-import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+from matplotlib.patches import Patch
+
+from figure_cache import FORMATS, FigureJob, plot_path, render_context, render_figures
+from success_trend import SOURCE_TABLE, refresh_success_trend, yearly_success
+from sparse_features import save_sparse_features
+from feature_encoding import CategoryEncoder, HashingEncoder
 
 OUT_DIR = os.path.join('module.02')
 PLOTS_DIR = os.path.join(OUT_DIR, 'plots')
@@ -13,6 +23,11 @@ SUMMARY_MD = os.path.join(OUT_DIR, 'spacex_eda_viz_summary.md')
 REMOTE_URL = 'https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/IBM-DS0321EN-SkillsNetwork/datasets/dataset_part_2.csv'
 LOCAL_FALLBACK = os.path.join('module.01', 'spacex_launches_clean.csv')
 DUMMIES_CSV = os.path.join(OUT_DIR, 'spacex_features_with_dummies.csv')
+DUMMIES_NPZ = os.path.join(OUT_DIR, 'spacex_features_with_dummies.npz')
+VOCAB_JSON = os.path.join(OUT_DIR, 'spacex_features_vocab.json')
+HASHED_COLUMNS = ['LandingPad', 'Serial']
+AGG_ROW_THRESHOLD = 50_000
+AGG_BINS = 100
 
 
 def ensure_dirs():
@@ -45,69 +60,225 @@ def load_dataset() -> pd.DataFrame:
     return df, source
 
 
-def plot_relationships(df: pd.DataFrame) -> list[str]:
-    sns.set(style='whitegrid')
-    paths: list[str] = []
-
-    # Relationship 1: FlightNumber vs PayloadMass by Class
-    fig, ax = plt.subplots(figsize=(9,5))
-    sns.scatterplot(data=df, x='FlightNumber', y='PayloadMass', hue='Class', ax=ax)
+def _plot_flight_vs_payload(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    sns.scatterplot(data=data, x='FlightNumber', y='PayloadMass', hue='Class', ax=ax)
     ax.set_title('Payload mass vs Flight number by landing success')
     ax.set_xlabel('FlightNumber')
     ax.set_ylabel('PayloadMass (kg)')
-    p1 = os.path.join(PLOTS_DIR, 'viz_flight_vs_payload.png')
-    fig.tight_layout(); fig.savefig(p1, dpi=150); plt.close(fig)
-    paths.append(p1)
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def _plot_payload_vs_orbit(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    sns.stripplot(data=data, x='PayloadMass', y='Orbit', hue='Class', dodge=True, alpha=0.7, ax=ax)
+    ax.set_title('Payload mass by Orbit and landing success')
+    ax.set_xlabel('PayloadMass (kg)')
+    ax.set_ylabel('Orbit')
+    handles, labels = ax.get_legend_handles_labels()
+    if len(labels) > 1:
+        ax.legend(handles[:2], labels[:2], title='Class')
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def _bin_index(values: np.ndarray, lo: float, hi: float, bins: int) -> np.ndarray:
+    if hi <= lo:
+        hi = lo + 1.0
+    idx = ((values - lo) * (bins / (hi - lo))).astype(np.int64)
+    return np.clip(idx, 0, bins - 1)
+
+
+def _density_counts(df: pd.DataFrame, x: str, y: str, x_bins: int, y_bins: Optional[int]) -> tuple[pd.DataFrame, dict]:
+    """Non-zero cells of per-Class 2-D histograms; y is categorical when y_bins is None."""
+    d = df[[x, y, 'Class']].dropna()
+    xv = pd.to_numeric(d[x], errors='coerce').to_numpy(dtype=float)
+    keep = ~np.isnan(xv)
+    d, xv = d[keep], xv[keep]
+    classes, class_codes = np.unique(d['Class'].to_numpy(), return_inverse=True)
+    meta: dict = {'classes': classes.tolist(), 'x_bins': x_bins}
+    if len(xv) == 0:
+        meta.update(x_range=[0.0, 1.0], y_bins=1, y_range=[0.0, 1.0], y_labels=[])
+        return pd.DataFrame({'class_code': [], 'ybin': [], 'xbin': [], 'count': []}), meta
+    meta['x_range'] = [float(xv.min()), float(xv.max())]
+    xb = _bin_index(xv, *meta['x_range'], x_bins)
+    if y_bins is None:
+        yb, labels = pd.factorize(d[y])
+        y_bins = len(labels)
+        meta['y_labels'] = [str(v) for v in labels]
+    else:
+        yv = pd.to_numeric(d[y], errors='coerce').to_numpy(dtype=float)
+        meta['y_range'] = [float(np.nanmin(yv)), float(np.nanmax(yv))]
+        yb = _bin_index(yv, *meta['y_range'], y_bins)
+    meta['y_bins'] = y_bins
+    # One bincount over (class, y, x) instead of a histogram per class
+    counts = np.bincount((class_codes * y_bins + yb) * x_bins + xb, minlength=len(classes) * y_bins * x_bins)
+    nz = np.flatnonzero(counts)
+    code, rest = np.divmod(nz, y_bins * x_bins)
+    ybin, xbin = np.divmod(rest, x_bins)
+    return pd.DataFrame({'class_code': code, 'ybin': ybin, 'xbin': xbin, 'count': counts[nz]}), meta
+
+
+def _class_grid(data: pd.DataFrame, code: int, shape: tuple[int, int], row_scale: int = 1, row_offset: int = 0) -> np.ma.MaskedArray:
+    part = data[data['class_code'] == code]
+    grid = np.zeros(shape)
+    grid[part['ybin'].to_numpy() * row_scale + row_offset, part['xbin'].to_numpy()] = part['count'].to_numpy()
+    return np.ma.masked_equal(grid, 0)
+
+
+def _plot_flight_vs_payload_density(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    extent = (*params['x_range'], *params['y_range'])
+    colors = sns.color_palette(n_colors=max(len(params['classes']), 1))
+    handles = []
+    for code, (label, color) in enumerate(zip(params['classes'], colors)):
+        grid = _class_grid(data, code, (params['y_bins'], params['x_bins']))
+        ax.imshow(grid, origin='lower', extent=extent, aspect='auto', interpolation='nearest', alpha=0.75,
+                  cmap=sns.light_palette(color, as_cmap=True), norm=LogNorm(vmin=1, vmax=max(grid.max(), 1)))
+        handles.append(Patch(color=color, label=str(label)))
+    if handles:
+        ax.legend(handles=handles, title='Class')
+    ax.set_title('Payload mass vs Flight number by landing success (launch density)')
+    ax.set_xlabel('FlightNumber')
+    ax.set_ylabel('PayloadMass (kg)')
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def _plot_payload_vs_orbit_density(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    n_orbits, n_classes = len(params['y_labels']), max(len(params['classes']), 1)
+    # Each orbit band is split into one sub-row per class, like stripplot(dodge=True)
+    extent = (*params['x_range'], -0.5, n_orbits - 0.5)
+    colors = sns.color_palette(n_colors=n_classes)
+    handles = []
+    for code, (label, color) in enumerate(zip(params['classes'], colors)):
+        grid = _class_grid(data, code, (n_orbits * n_classes, params['x_bins']), n_classes, code)
+        ax.imshow(grid, origin='lower', extent=extent, aspect='auto', interpolation='nearest',
+                  cmap=sns.light_palette(color, as_cmap=True), norm=LogNorm(vmin=1, vmax=max(grid.max(), 1)))
+        handles.append(Patch(color=color, label=str(label)))
+    ax.set_yticks(range(n_orbits))
+    ax.set_yticklabels(params['y_labels'])
+    ax.invert_yaxis()
+    if handles:
+        ax.legend(handles=handles, title='Class')
+    ax.set_title('Payload mass by Orbit and landing success (launch density)')
+    ax.set_xlabel('PayloadMass (kg)')
+    ax.set_ylabel('Orbit')
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def relationship_jobs(df: pd.DataFrame, agg_threshold: int = AGG_ROW_THRESHOLD, fmt: str = 'png') -> list[FigureJob]:
+    jobs: list[FigureJob] = []
+    # Past the threshold, draw binned densities instead of one marker per row
+    aggregate = len(df) > agg_threshold
+
+    # Relationship 1: FlightNumber vs PayloadMass by Class
+    path = plot_path(PLOTS_DIR, 'viz_flight_vs_payload', fmt)
+    style = {'style': 'whitegrid', 'figsize': (9, 5), 'dpi': 150,
+             'margins': {'left': 0.12, 'right': 0.975, 'bottom': 0.14, 'top': 0.92}}
+    if aggregate:
+        counts, meta = _density_counts(df, 'FlightNumber', 'PayloadMass', AGG_BINS, AGG_BINS)
+        jobs.append(FigureJob(path, _plot_flight_vs_payload_density, counts, {**style, **meta}))
+    else:
+        jobs.append(FigureJob(path, _plot_flight_vs_payload, df[['FlightNumber', 'PayloadMass', 'Class']], style))
 
     # Relationship 2: Orbit vs PayloadMass by Class
     if 'Orbit' in df.columns:
-        fig, ax = plt.subplots(figsize=(9,6))
-        sns.stripplot(data=df, x='PayloadMass', y='Orbit', hue='Class', dodge=True, alpha=0.7, ax=ax)
-        ax.set_title('Payload mass by Orbit and landing success')
-        ax.set_xlabel('PayloadMass (kg)')
-        ax.set_ylabel('Orbit')
-        handles, labels = ax.get_legend_handles_labels()
-        if len(labels) > 1:
-            ax.legend(handles[:2], labels[:2], title='Class')
-        p2 = os.path.join(PLOTS_DIR, 'viz_payload_vs_orbit.png')
-        fig.tight_layout(); fig.savefig(p2, dpi=150); plt.close(fig)
-        paths.append(p2)
-
-    return paths
-
-
-def plot_yearly_success_trend(df: pd.DataFrame) -> str:
-    # Parse year
-    if 'Date' in df.columns:
-        years = pd.to_datetime(df['Date'], errors='coerce').dt.year
-    else:
-        years = pd.Series([np.nan]*len(df))
-    rate_by_year = pd.DataFrame({'Year': years, 'Class': pd.to_numeric(df.get('Class', np.nan), errors='coerce')})
-    rate_by_year = rate_by_year.dropna().groupby('Year')['Class'].mean().reset_index()
+        path = plot_path(PLOTS_DIR, 'viz_payload_vs_orbit', fmt)
+        style = {'style': 'whitegrid', 'figsize': (9, 6), 'dpi': 150,
+                 'margins': {'left': 0.11, 'right': 0.975, 'bottom': 0.12, 'top': 0.93}}
+        if aggregate:
+            counts, meta = _density_counts(df, 'PayloadMass', 'Orbit', AGG_BINS, None)
+            jobs.append(FigureJob(path, _plot_payload_vs_orbit_density, counts, {**style, **meta}))
+        else:
+            jobs.append(FigureJob(path, _plot_payload_vs_orbit, df[['PayloadMass', 'Orbit', 'Class']], style))
+    return jobs
+
+
+def plot_relationships(df: pd.DataFrame, workers: Optional[int] = None,
+                       agg_threshold: int = AGG_ROW_THRESHOLD, fmt: str = 'png') -> list[str]:
+    return render_figures(relationship_jobs(df, agg_threshold, fmt), workers=workers)
+
 
-    fig, ax = plt.subplots(figsize=(9,4))
-    sns.lineplot(data=rate_by_year, x='Year', y='Class', marker='o', ax=ax)
+def _plot_success_trend(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    sns.lineplot(data=data, x='Year', y='rate', marker='o', ax=ax)
     ax.set_ylim(0, 1)
     ax.set_title('Launch success rate by year')
     ax.set_ylabel('Success rate')
-    p = os.path.join(PLOTS_DIR, 'viz_success_trend_by_year.png')
-    fig.tight_layout(); fig.savefig(p, dpi=150); plt.close(fig)
-    return p
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
 
 
-def build_dummies(df: pd.DataFrame) -> pd.DataFrame:
+def yearly_trend(df: pd.DataFrame) -> pd.DataFrame:
+    """Success rate per year of `df`, through the same success_trend SQL spacex_eda_sql keeps in spacex.db."""
+    launches = pd.DataFrame({
+        'FlightNumber': df['FlightNumber'] if 'FlightNumber' in df.columns else np.arange(1, len(df) + 1),
+        # strftime('%Y', Date) in the trend SQL needs ISO dates
+        'Date': pd.to_datetime(df['Date'], errors='coerce').dt.strftime('%Y-%m-%d') if 'Date' in df.columns else None,
+        'LaunchSite': df.get('LaunchSite'),
+        'Block': df.get('Block'),
+        'LandingSuccess': pd.to_numeric(df.get('Class', np.nan), errors='coerce'),
+    })
+    # Launches without a known outcome are left out of the rate, not counted as failures
+    launches = launches.dropna(subset=['LandingSuccess'])
+    with closing(sqlite3.connect(':memory:')) as conn:
+        launches.to_sql(SOURCE_TABLE, conn, index=False)
+        refresh_success_trend(conn)
+        return yearly_success(conn)
+
+
+def success_trend_job(df: pd.DataFrame, fmt: str = 'png') -> FigureJob:
+    rate_by_year = yearly_trend(df)
+    return FigureJob(plot_path(PLOTS_DIR, 'viz_success_trend_by_year', fmt), _plot_success_trend,
+                     rate_by_year[['Year', 'rate']],
+                     {'style': 'whitegrid', 'figsize': (9, 4), 'dpi': 150,
+                      'margins': {'left': 0.09, 'right': 0.975, 'bottom': 0.18, 'top': 0.9}})
+
+
+def plot_yearly_success_trend(df: pd.DataFrame, fmt: str = 'png') -> str:
+    return render_figures([success_trend_job(df, fmt)])[0]
+
+
+def build_dummies(df: pd.DataFrame, sparse: bool = False, encoder: Optional[CategoryEncoder] = None,
+                  hash_buckets: Optional[int] = None) -> pd.DataFrame:
     # Select features as in the notebook
     cols = ['FlightNumber', 'PayloadMass', 'Orbit', 'LaunchSite', 'Flights', 'GridFins', 'Reused', 'Legs', 'LandingPad', 'Block', 'ReusedCount', 'Serial']
     avail = [c for c in cols if c in df.columns]
     features = df[avail].copy()
-    # Identify categoricals present
-    cat_cols = [c for c in ['Orbit', 'LaunchSite', 'LandingPad', 'Serial'] if c in features.columns]
-    dummies = pd.get_dummies(features, columns=cat_cols, drop_first=False, dtype=int)
-    dummies.to_csv(DUMMIES_CSV, index=False)
+    # High-cardinality columns go through the fixed-width hashing encoder when requested
+    if encoder is None:
+        hashed = [c for c in HASHED_COLUMNS if c in features.columns] if hash_buckets else []
+        # Identify categoricals present and persist their vocabulary next to the features
+        cat_cols = [c for c in ['Orbit', 'LaunchSite', 'LandingPad', 'Serial'] if c in features.columns and c not in hashed]
+        encoder = CategoryEncoder(cat_cols, hashed=hashed, n_buckets=hash_buckets).fit(features.drop(columns=hashed))
+        encoder.save(VOCAB_JSON)
+    else:
+        # A saved vocabulary fixes the layout; refuse inputs that would silently change it
+        if hash_buckets is not None and hash_buckets != encoder.n_buckets:
+            saved = f'hash_buckets={encoder.n_buckets}' if encoder.hashed else 'no hashed columns'
+            raise ValueError(f'Vocabulary was saved with {saved}, not hash_buckets={hash_buckets}')
+        expected = set(encoder.passthrough) | set(encoder.categorical) | set(encoder.hashed)
+        if set(features.columns) != expected:
+            raise ValueError(f'Feature columns do not match the saved vocabulary: '
+                             f'missing {sorted(expected - set(features.columns))}, '
+                             f'unencoded {sorted(set(features.columns) - expected)}')
+    dummies = encoder.transform(features.drop(columns=encoder.hashed), sparse=sparse)
+    if encoder.hashed:
+        hasher = HashingEncoder(encoder.hashed, n_buckets=encoder.n_buckets)
+        dummies = pd.concat([dummies, hasher.transform(features, sparse=sparse)], axis=1)
+    if sparse:
+        save_sparse_features(dummies, DUMMIES_NPZ)
+    else:
+        dummies.to_csv(DUMMIES_CSV, index=False)
     return dummies
 
 
-def write_summary(df: pd.DataFrame, source: str, rel_plots: list[str], trend_plot: str, dummies: pd.DataFrame) -> None:
+def write_summary(df: pd.DataFrame, source: str, rel_plots: list[str], trend_plot: str, dummies: pd.DataFrame,
+                  dummies_path: str = DUMMIES_CSV) -> None:
     lines: list[str] = []
     lines.append('# SpaceX EDA Visualization Summary')
     lines.append('')
@@ -132,22 +303,34 @@ def write_summary(df: pd.DataFrame, source: str, rel_plots: list[str], trend_plo
     lines.append('```')
     lines.append(dummies.head().to_string(index=False))
     lines.append('```')
-    lines.append(f'Saved to: {DUMMIES_CSV}')
+    lines.append(f'Saved to: {dummies_path}')
 
     with open(SUMMARY_MD, 'w', encoding='utf-8') as f:
         f.write('\n'.join(lines) + '\n')
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description='SpaceX EDA visualization report')
+    parser.add_argument('--sparse', action='store_true',
+                        help='one-hot encode into sparse columns and save them as .npz instead of CSV')
+    parser.add_argument('--vocab', default=None,
+                        help='encode with a saved category vocabulary instead of refitting it')
+    parser.add_argument('--hash-buckets', type=int, default=None,
+                        help='hash LandingPad and Serial into this many fixed columns instead of one-hot')
+    parser.add_argument('--format', choices=FORMATS, default='png', help='image format for the plots')
+    args = parser.parse_args(argv)
+
     ensure_dirs()
     df, source = load_dataset()
-    rel_plots = plot_relationships(df)
-    trend_plot = plot_yearly_success_trend(df)
-    dummies = build_dummies(df)
-    write_summary(df, source, rel_plots, trend_plot, dummies)
+    rel_plots = plot_relationships(df, fmt=args.format)
+    trend_plot = plot_yearly_success_trend(df, fmt=args.format)
+    encoder = CategoryEncoder.load(args.vocab) if args.vocab else None
+    dummies = build_dummies(df, sparse=args.sparse, encoder=encoder, hash_buckets=args.hash_buckets)
+    dummies_path = DUMMIES_NPZ if args.sparse else DUMMIES_CSV
+    write_summary(df, source, rel_plots, trend_plot, dummies, dummies_path)
     print(f'Saved summary MD: {SUMMARY_MD}')
     print(f'Saved plots to: {PLOTS_DIR}')
-    print(f'Saved dummies CSV: {DUMMIES_CSV}')
+    print(f'Saved dummies: {dummies_path}')
 
 
 if __name__ == '__main__':
@@ -1,13 +1,18 @@
 import os
+import re
 import sqlite3
+import argparse
 import datetime
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
 
+from figure_cache import FORMATS, FigureJob, plot_path, render_context, render_figures
+from success_trend import refresh_success_trend, yearly_success
+from binned_kde import payload_distribution, payload_summary
+
 API_CSV = os.path.join('module.01', 'spacex_launches_clean.csv')
 SCRAPED_CSV = os.path.join('module.01', 'spacex_webscraping.csv')
 OUT_DIR = os.path.join('module.02')
@@ -62,94 +67,192 @@ def merge_data(api_df: pd.DataFrame, scraped_df: pd.DataFrame) -> pd.DataFrame:
     return merged
 
 
-def save_sql_tables(merged: pd.DataFrame, api_df: pd.DataFrame, scraped_df: pd.DataFrame) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
+def open_db(in_memory: bool = False) -> sqlite3.Connection:
+    # In-memory mode keeps load and queries off the disk until persist_db
+    return sqlite3.connect(':memory:' if in_memory else DB_PATH)
+
+
+def persist_db(conn: sqlite3.Connection, path: str = DB_PATH) -> None:
+    # Snapshot through the backup API into a temp file, then swap it in
+    tmp = path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    dst = sqlite3.connect(tmp)
+    try:
+        conn.backup(dst)
+    finally:
+        dst.close()
+    os.replace(tmp, path)
+
+
+FTS_TABLE = 'launches_fts'
+FTS_COLUMNS = ['Payload', 'Customer']
+
+
+def _create_fts(conn: sqlite3.Connection) -> None:
+    # External-content FTS5 index over launches_scraped; triggers keep it in sync
+    # with later inserts, updates and deletes on the base table.
+    cols = ', '.join(f'"{c}"' for c in FTS_COLUMNS)
+    new_cols = ', '.join(f'new."{c}"' for c in FTS_COLUMNS)
+    old_cols = ', '.join(f'old."{c}"' for c in FTS_COLUMNS)
+    conn.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({cols}, content='launches_scraped', "
+        f"content_rowid='rowid', prefix='2 3')")
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+    conn.execute(
+        f"CREATE TRIGGER launches_scraped_fts_ai AFTER INSERT ON launches_scraped BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.rowid, {new_cols}); END")
+    conn.execute(
+        f"CREATE TRIGGER launches_scraped_fts_ad AFTER DELETE ON launches_scraped BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols}); END")
+    conn.execute(
+        f"CREATE TRIGGER launches_scraped_fts_au AFTER UPDATE ON launches_scraped BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.rowid, {new_cols}); END")
+
+
+def save_sql_tables(conn: sqlite3.Connection, merged: pd.DataFrame, api_df: pd.DataFrame, scraped_df: pd.DataFrame,
+                    fts: bool = False) -> None:
+    with conn:
         api_df.to_sql('launches_api', conn, if_exists='replace', index=False)
         scraped_df.to_sql('launches_scraped', conn, if_exists='replace', index=False)
         merged.to_sql('launches_merged', conn, if_exists='replace', index=False)
-
-
-def run_queries() -> dict[str, pd.DataFrame]:
+        if fts and all(c in scraped_df.columns for c in FTS_COLUMNS):
+            _create_fts(conn)
+        else:
+            # An index left over from an earlier run would no longer match the new rows
+            conn.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def _fts_query(text: str, prefix: bool = True) -> str:
+    # Quote each word so input like "NASA (CRS)" is not parsed as FTS5 syntax
+    tokens = re.findall(r'\w+', text)
+    if not tokens:
+        return ''
+    terms = [f'"{t}"' for t in tokens]
+    if prefix:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_launches(conn: sqlite3.Connection, text: str, limit: int = 20, prefix: bool = True) -> pd.DataFrame:
+    """Scraped launches whose Payload or Customer match `text`, best match first."""
+    query = _fts_query(text, prefix=prefix)
+    if not query:
+        return pd.DataFrame()
+    return pd.read_sql_query(
+        f"""
+        SELECT s.*, bm25({FTS_TABLE}) AS rank
+        FROM {FTS_TABLE}
+        JOIN launches_scraped AS s ON s.rowid = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH ?
+        ORDER BY rank
+        LIMIT ?;
+        """, conn, params=(query, limit))
+
+
+def run_queries(conn: sqlite3.Connection) -> dict[str, pd.DataFrame]:
     results: dict[str, pd.DataFrame] = {}
-    with sqlite3.connect(DB_PATH) as conn:
-        results['by_orbit'] = pd.read_sql_query(
-            """
-            SELECT Orbit, COUNT(*) AS launches
-            FROM launches_merged
-            GROUP BY Orbit
-            ORDER BY launches DESC;
-            """, conn)
-        results['success_rate_by_site'] = pd.read_sql_query(
+    results['by_orbit'] = pd.read_sql_query(
+        """
+        SELECT Orbit, COUNT(*) AS launches
+        FROM launches_merged
+        GROUP BY Orbit
+        ORDER BY launches DESC;
+        """, conn)
+    results['success_rate_by_site'] = pd.read_sql_query(
+        """
+        SELECT LaunchSite,
+               AVG(CASE WHEN Outcome LIKE 'True %' THEN 1.0 WHEN Outcome LIKE 'False %' THEN 0.0 ELSE NULL END) AS landing_success_rate,
+               COUNT(*) AS n
+        FROM launches_merged
+        GROUP BY LaunchSite
+        HAVING n >= 3
+        ORDER BY landing_success_rate DESC;
+        """, conn)
+    results['avg_payload_by_site'] = pd.read_sql_query(
+        """
+        SELECT LaunchSite, ROUND(AVG(PayloadMass),2) AS avg_payload_kg, COUNT(*) AS n
+        FROM launches_merged
+        GROUP BY LaunchSite
+        ORDER BY avg_payload_kg DESC;
+        """, conn)
+    if 'Customer' in pd.read_sql_query("SELECT * FROM launches_merged LIMIT 1;", conn).columns:
+        results['top_customers'] = pd.read_sql_query(
             """
-            SELECT LaunchSite,
-                   AVG(CASE WHEN Outcome LIKE 'True %' THEN 1.0 WHEN Outcome LIKE 'False %' THEN 0.0 ELSE NULL END) AS landing_success_rate,
-                   COUNT(*) AS n
+            SELECT COALESCE(Customer, 'Unknown') AS Customer, COUNT(*) AS launches
             FROM launches_merged
-            GROUP BY LaunchSite
-            HAVING n >= 3
-            ORDER BY landing_success_rate DESC;
+            GROUP BY Customer
+            ORDER BY launches DESC
+            LIMIT 10;
             """, conn)
-        results['avg_payload_by_site'] = pd.read_sql_query(
-            """
-            SELECT LaunchSite, ROUND(AVG(PayloadMass),2) AS avg_payload_kg, COUNT(*) AS n
-            FROM launches_merged
-            GROUP BY LaunchSite
-            ORDER BY avg_payload_kg DESC;
-            """, conn)
-        if 'Customer' in pd.read_sql_query("SELECT * FROM launches_merged LIMIT 1;", conn).columns:
-            results['top_customers'] = pd.read_sql_query(
-                """
-                SELECT COALESCE(Customer, 'Unknown') AS Customer, COUNT(*) AS launches
-                FROM launches_merged
-                GROUP BY Customer
-                ORDER BY launches DESC
-                LIMIT 10;
-                """, conn)
     return results
 
 
-def make_plots(merged: pd.DataFrame) -> List[str]:
-    saved: List[str] = []
-    sns.set(style='whitegrid')
-
-    # 1. Landing outcomes by year
-    fig, ax = plt.subplots(figsize=(8,4))
-    yearly = merged.groupby(['Year', 'LandingSuccess']).size().unstack(fill_value=0)
+def _plot_outcomes_by_year(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    yearly = pd.DataFrame({False: data['launches'] - data['successes'], True: data['successes']})
+    yearly.index = data['Year']
+    yearly.columns.name = 'LandingSuccess'
     yearly.plot(kind='bar', stacked=True, ax=ax)
     ax.set_title('Launch outcomes by year')
     ax.set_xlabel('Year')
     ax.set_ylabel('Count')
-    p1 = os.path.join(PLOTS_DIR, 'outcomes_by_year.png')
-    fig.tight_layout()
-    fig.savefig(p1, dpi=150)
-    plt.close(fig)
-    saved.append(p1)
-
-    # 2. Payload mass distribution
-    fig, ax = plt.subplots(figsize=(8,4))
-    sns.histplot(pd.to_numeric(merged['PayloadMass'], errors='coerce').dropna(), bins=30, kde=True, ax=ax)
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def _plot_payload_distribution(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    # Histogram plus binned FFT KDE; near-linear in the number of payloads
+    dist = payload_distribution(pd.to_numeric(data['PayloadMass'], errors='coerce').to_numpy(), bins=params['bins'])
+    color = sns.color_palette()[0]
+    ax.bar(dist['edges'][:-1], dist['counts'], width=np.diff(dist['edges']), align='edge',
+           color=color, alpha=0.75, edgecolor='white', linewidth=0.5)
+    ax.plot(dist['kde_x'], dist['kde_y'], color=color)
+    ax.set_ylabel('Count')
     ax.set_title('Payload mass distribution (kg)')
     ax.set_xlabel('PayloadMass (kg)')
-    p2 = os.path.join(PLOTS_DIR, 'payload_distribution.png')
-    fig.tight_layout()
-    fig.savefig(p2, dpi=150)
-    plt.close(fig)
-    saved.append(p2)
-
-    # 3. Top launch sites
-    fig, ax = plt.subplots(figsize=(8,4))
-    sites = merged['LaunchSite'].value_counts().head(5)
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def _plot_top_launch_sites(data: pd.DataFrame, path: str, params: dict) -> None:
+    ctx = render_context(params['style'])
+    fig, ax = ctx.figure(params['figsize'], params.get('margins'))
+    sites = data['LaunchSite'].value_counts().head(5)
     sns.barplot(x=sites.values, y=sites.index, ax=ax)
     ax.set_title('Top 5 Launch Sites by count')
     ax.set_xlabel('Launches')
     ax.set_ylabel('Launch Site')
-    p3 = os.path.join(PLOTS_DIR, 'top_launch_sites.png')
-    fig.tight_layout()
-    fig.savefig(p3, dpi=150)
-    plt.close(fig)
-    saved.append(p3)
-
-    return saved
+    ctx.save(fig, path, params['dpi'], params.get('margins'))
+
+
+def plot_jobs(merged: pd.DataFrame, yearly: pd.DataFrame, fmt: str = 'png') -> List[FigureJob]:
+    # Fixed margins (measured once with tight_layout) skip the layout solve per plot
+    style = {'style': 'whitegrid', 'figsize': (8, 4), 'dpi': 150}
+    return [
+        # 1. Landing outcomes by year (from the success_trend table)
+        FigureJob(plot_path(PLOTS_DIR, 'outcomes_by_year', fmt), _plot_outcomes_by_year,
+                  yearly[['Year', 'launches', 'successes']],
+                  {**style, 'margins': {'left': 0.11, 'right': 0.975, 'bottom': 0.24, 'top': 0.9}}),
+        # 2. Payload mass distribution
+        FigureJob(plot_path(PLOTS_DIR, 'payload_distribution', fmt), _plot_payload_distribution,
+                  merged[['PayloadMass']],
+                  {**style, 'bins': 30, 'margins': {'left': 0.1, 'right': 0.96, 'bottom': 0.18, 'top': 0.9}},
+                  deps=('binned_kde',)),
+        # 3. Top launch sites
+        FigureJob(plot_path(PLOTS_DIR, 'top_launch_sites', fmt), _plot_top_launch_sites,
+                  merged[['LaunchSite']],
+                  {**style, 'margins': {'left': 0.21, 'right': 0.975, 'bottom': 0.18, 'top': 0.9}}),
+    ]
+
+
+def make_plots(merged: pd.DataFrame, yearly: pd.DataFrame, workers: Optional[int] = None,
+               fmt: str = 'png') -> List[str]:
+    # Each plot is re-rendered only when its input columns or style change
+    return render_figures(plot_jobs(merged, yearly, fmt), workers=workers)
 
 
 def write_markdown(merged: pd.DataFrame, results: dict[str, pd.DataFrame], plot_paths: List[str]) -> None:
@@ -193,19 +296,42 @@ def write_markdown(merged: pd.DataFrame, results: dict[str, pd.DataFrame], plot_
         f.write('\n'.join(lines) + '\n')
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='SpaceX EDA + SQL report')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='load and query an in-memory database, then snapshot it to spacex.db once')
+    parser.add_argument('--no-persist', action='store_true',
+                        help='with --in-memory, do not write spacex.db at all')
+    parser.add_argument('--fts', action='store_true',
+                        help='maintain an FTS5 index over scraped Payload and Customer names')
+    parser.add_argument('--workers', type=int, default=None, help='processes for rendering stale plots')
+    parser.add_argument('--format', choices=FORMATS, default='png', help='image format for the plots')
+    args = parser.parse_args(argv)
+
     ensure_dirs()
     api_df, scraped_df = read_data()
     merged = merge_data(api_df, scraped_df)
     merged.to_csv(MERGED_CSV, index=False)
 
-    save_sql_tables(merged, api_df, scraped_df)
-    results = run_queries()
-    plots = make_plots(merged)
+    conn = open_db(in_memory=args.in_memory)
+    try:
+        save_sql_tables(conn, merged, api_df, scraped_df, fts=args.fts)
+        refresh_success_trend(conn)
+        results = run_queries(conn)
+        yearly = yearly_success(conn)
+        results['success_trend_by_year'] = yearly
+        results['payload_distribution'] = payload_summary(pd.to_numeric(merged['PayloadMass'], errors='coerce').to_numpy())
+        persisted = not (args.in_memory and args.no_persist)
+        if args.in_memory and persisted:
+            persist_db(conn)
+    finally:
+        conn.close()
+    plots = make_plots(merged, yearly, workers=args.workers, fmt=args.format)
     write_markdown(merged, results, plots)
 
     print(f"Saved merged CSV: {MERGED_CSV}")
-    print(f"Saved SQLite DB: {DB_PATH}")
+    if persisted:
+        print(f"Saved SQLite DB: {DB_PATH}")
     print(f"Saved summary MD: {SUMMARY_MD}")
 
 
@@ -0,0 +1,88 @@
+"""Compact on-disk format for mostly-zero feature matrices.
+
+A feature frame is stored as column-major COO triplets (row, col, value) plus
+the column names and shape, in one compressed .npz file. Only non-zero cells
+are written, so file size and load memory scale with the number of non-zeros,
+not with rows x categories. NaN is kept as an explicit value.
+
+Sparse columns are built through SparseArray.from_spmatrix when scipy is
+installed, and from a dense column otherwise.
+"""
+from __future__ import annotations
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+def sparse_column(values: np.ndarray, rows: np.ndarray, n_rows: int) -> pd.arrays.SparseArray:
+    """A fill-0 SparseArray of length `n_rows` holding `values` at the increasing positions `rows`."""
+    try:
+        from scipy import sparse
+    except ImportError:
+        dense = np.zeros(n_rows, dtype=values.dtype)
+        dense[rows] = values
+        return pd.arrays.SparseArray(dense, dtype=pd.SparseDtype(values.dtype, values.dtype.type(0).item()))
+    # A one-column CSC matrix is exactly (values, rows); no dense pass over n_rows
+    return pd.arrays.SparseArray.from_spmatrix(
+        sparse.csc_matrix((values, rows, [0, len(rows)]), shape=(n_rows, 1)))
+
+
+def _column_nonzeros(values: Union[pd.arrays.SparseArray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(values, pd.arrays.SparseArray) and values.fill_value == 0:
+        rows = values.sp_index.to_int_index().indices
+        data = np.asarray(values.sp_values, dtype=np.float64)
+        keep = data != 0
+        return rows[keep], data[keep]
+    dense = np.asarray(values, dtype=np.float64)
+    rows = np.flatnonzero(dense != 0)
+    return rows, dense[rows]
+
+
+def save_sparse_features(df: pd.DataFrame, path: str) -> None:
+    """Write `df` (dense, SparseDtype or mixed columns) as COO triplets."""
+    rows: list[np.ndarray] = []
+    data: list[np.ndarray] = []
+    indptr = np.zeros(df.shape[1] + 1, dtype=np.int64)
+    for j, col in enumerate(df.columns):
+        r, d = _column_nonzeros(df[col].array)
+        rows.append(r.astype(np.int32))
+        data.append(d)
+        indptr[j + 1] = indptr[j] + len(r)
+    np.savez_compressed(
+        path,
+        rows=np.concatenate(rows) if rows else np.empty(0, dtype=np.int32),
+        data=np.concatenate(data) if data else np.empty(0, dtype=np.float64),
+        indptr=indptr,
+        columns=np.array([str(c) for c in df.columns]),
+        shape=np.array(df.shape, dtype=np.int64),
+    )
+
+
+def load_sparse_features(path: str, fmt: str = 'frame'):
+    """Load a file written by save_sparse_features.
+
+    fmt='frame' returns a DataFrame of Sparse[float64, 0] columns;
+    fmt='csr' returns (scipy.sparse.csr_matrix, column names) and needs scipy.
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        rows, data, indptr = npz['rows'], npz['data'], npz['indptr']
+        columns = npz['columns'].tolist()
+        n_rows, n_cols = (int(x) for x in npz['shape'])
+
+    if fmt == 'csr':
+        try:
+            from scipy import sparse
+        except ImportError as e:
+            raise ImportError("fmt='csr' requires scipy (pip install scipy)") from e
+        # Stored column-major, i.e. CSC; convert for row-wise model input
+        csc = sparse.csc_matrix((data, rows, indptr), shape=(n_rows, n_cols))
+        return csc.tocsr(), columns
+    if fmt != 'frame':
+        raise ValueError(f"Unknown fmt: {fmt!r}")
+
+    cols = {}
+    for j, name in enumerate(columns):
+        lo, hi = indptr[j], indptr[j + 1]
+        cols[name] = sparse_column(data[lo:hi].astype(np.float64, copy=False), rows[lo:hi], n_rows)
+    return pd.DataFrame(cols, index=pd.RangeIndex(n_rows))
@@ -0,0 +1,152 @@
+"""Landing success-rate time series kept in spacex.db.
+
+success_trend holds one row per launch for each of three scopes: 'overall'
+(key 'ALL'), 'site' (LaunchSite) and 'booster' (block category, e.g. 'Block 5').
+Each row has the launch sequence number within its key, plus cumulative and
+rolling-N-launch success rates computed with window functions over
+launches_merged.
+
+refresh_success_trend is incremental. Launches with a FlightNumber above the
+stored watermark are appended, continuing each key's running totals. Rolling
+rates come from differences of the stored cumulative sums. If the rows already
+covered no longer match, or the window changes, the table is rebuilt.
+"""
+from __future__ import annotations
+import sqlite3
+from typing import Optional
+
+import pandas as pd
+
+TREND_TABLE = 'success_trend'
+META_TABLE = 'success_trend_meta'
+SOURCE_TABLE = 'launches_merged'
+DEFAULT_WINDOW = 10
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TREND_TABLE} (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    FlightNumber INTEGER NOT NULL,
+    Date TEXT,
+    Year INTEGER,
+    success INTEGER NOT NULL,
+    cum_launches INTEGER NOT NULL,
+    cum_successes INTEGER NOT NULL,
+    cum_rate REAL NOT NULL,
+    rolling_launches INTEGER,
+    rolling_rate REAL,
+    PRIMARY KEY (scope, key, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_{TREND_TABLE}_flight ON {TREND_TABLE} (scope, FlightNumber);
+CREATE TABLE IF NOT EXISTS {META_TABLE} (window_size INTEGER NOT NULL);
+"""
+
+# New launches for every scope, tagged with their (scope, key)
+_BASE_SQL = f"""
+SELECT FlightNumber, Date, CAST(strftime('%Y', Date) AS INTEGER) AS Year,
+       COALESCE(LandingSuccess, 0) AS success, 'overall' AS scope, 'ALL' AS key
+FROM {SOURCE_TABLE} WHERE FlightNumber > :watermark
+UNION ALL
+SELECT FlightNumber, Date, CAST(strftime('%Y', Date) AS INTEGER),
+       COALESCE(LandingSuccess, 0), 'site', COALESCE(LaunchSite, 'Unknown')
+FROM {SOURCE_TABLE} WHERE FlightNumber > :watermark
+UNION ALL
+SELECT FlightNumber, Date, CAST(strftime('%Y', Date) AS INTEGER),
+       COALESCE(LandingSuccess, 0), 'booster', COALESCE('Block ' || CAST(Block AS INTEGER), 'Unknown')
+FROM {SOURCE_TABLE} WHERE FlightNumber > :watermark
+"""
+
+_APPEND_SQL = f"""
+WITH base AS ({_BASE_SQL}),
+last AS (
+    SELECT t.scope, t.key, t.seq, t.cum_successes
+    FROM {TREND_TABLE} AS t
+    JOIN (SELECT scope, key, MAX(seq) AS seq FROM {TREND_TABLE} GROUP BY scope, key) AS m
+      ON m.scope = t.scope AND m.key = t.key AND m.seq = t.seq
+),
+numbered AS (
+    SELECT b.scope, b.key, b.FlightNumber, b.Date, b.Year, b.success,
+           COALESCE(l.seq, 0) + ROW_NUMBER() OVER w AS seq,
+           COALESCE(l.cum_successes, 0) + SUM(b.success) OVER w AS cum_successes
+    FROM base AS b
+    LEFT JOIN last AS l ON l.scope = b.scope AND l.key = b.key
+    WINDOW w AS (PARTITION BY b.scope, b.key ORDER BY b.FlightNumber ROWS UNBOUNDED PRECEDING)
+)
+INSERT INTO {TREND_TABLE} (scope, key, seq, FlightNumber, Date, Year, success,
+                           cum_launches, cum_successes, cum_rate)
+SELECT scope, key, seq, FlightNumber, Date, Year, success,
+       seq, cum_successes, cum_successes * 1.0 / seq
+FROM numbered
+"""
+
+# Rolling rate over the last N launches of the key: cum[seq] - cum[seq - N]
+_ROLLING_SQL = f"""
+UPDATE {TREND_TABLE} AS t
+SET rolling_launches = MIN(t.seq, :window),
+    rolling_rate = (t.cum_successes - COALESCE(
+        (SELECT o.cum_successes FROM {TREND_TABLE} AS o
+         WHERE o.scope = t.scope AND o.key = t.key AND o.seq = t.seq - :window), 0)
+    ) * 1.0 / MIN(t.seq, :window)
+WHERE t.rolling_rate IS NULL
+"""
+
+
+def _watermark(conn: sqlite3.Connection) -> Optional[int]:
+    row = conn.execute(f"SELECT MAX(FlightNumber) FROM {TREND_TABLE} WHERE scope = 'overall'").fetchone()
+    return row[0] if row else None
+
+
+def _covered_rows_match(conn: sqlite3.Connection, watermark: int) -> bool:
+    # The stored prefix must still describe the same launches with the same outcomes
+    stored = conn.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(success), 0) FROM {TREND_TABLE} WHERE scope = 'overall'").fetchone()
+    source = conn.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(COALESCE(LandingSuccess, 0)), 0) FROM {SOURCE_TABLE} "
+        f"WHERE FlightNumber <= ?", (watermark,)).fetchone()
+    return tuple(stored) == tuple(source)
+
+
+def refresh_success_trend(conn: sqlite3.Connection, window: int = DEFAULT_WINDOW, rebuild: bool = False) -> int:
+    """Bring success_trend up to date with launches_merged; returns rows added."""
+    conn.executescript(SCHEMA)
+    with conn:
+        row = conn.execute(f'SELECT window_size FROM {META_TABLE}').fetchone()
+        watermark = _watermark(conn)
+        if rebuild or row is None or row[0] != window or (
+                watermark is not None and not _covered_rows_match(conn, watermark)):
+            conn.execute(f'DELETE FROM {TREND_TABLE}')
+            conn.execute(f'DELETE FROM {META_TABLE}')
+            conn.execute(f'INSERT INTO {META_TABLE} (window_size) VALUES (?)', (window,))
+            watermark = None
+        before = conn.total_changes
+        conn.execute(_APPEND_SQL, {'watermark': -1 if watermark is None else watermark})
+        added = conn.total_changes - before
+        conn.execute(_ROLLING_SQL, {'window': window})
+    return added
+
+
+def load_trend(conn: sqlite3.Connection, scope: str = 'overall', key: Optional[str] = None) -> pd.DataFrame:
+    sql = f'SELECT * FROM {TREND_TABLE} WHERE scope = ?'
+    params: list = [scope]
+    if key is not None:
+        sql += ' AND key = ?'
+        params.append(key)
+    return pd.read_sql_query(sql + ' ORDER BY key, seq;', conn, params=params)
+
+
+def yearly_success(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Launches, successes and success rate per year from the overall series."""
+    return pd.read_sql_query(
+        f"""
+        SELECT Year, COUNT(*) AS launches, SUM(success) AS successes, AVG(success) AS rate
+        FROM {TREND_TABLE}
+        WHERE scope = 'overall' AND Year IS NOT NULL
+        GROUP BY Year
+        ORDER BY Year;
+        """, conn)
+
+
+def has_trend(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TREND_TABLE,)).fetchone()
+    return row is not None
@@ -0,0 +1,107 @@
+// Clientside versions of update_pie and update_scatter for SPACEX_DASH_CLIENTSIDE=1.
+// Both read the columnar launch payload that the server puts in the
+// "launch-data" dcc.Store once, and build the same figures as the px
+// callbacks in spacex_dash_app.py without a server round trip.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    spacex: {
+        pie: function (site, data) {
+            if (!data) {
+                return window.dash_clientside.no_update;
+            }
+            var layout = {template: data.template, legend: {tracegroupgap: 0}};
+            var trace = {type: "pie", domain: {x: [0, 1], y: [0, 1]}, name: "", legendgroup: "", showlegend: true};
+            if (site === "ALL") {
+                // Success count per site (class == 1)
+                trace.labels = data.sites;
+                trace.values = data.sites.map(function (s) { return data.outcomes[s][0]; });
+                trace.hovertemplate = "label=%{label}<br>value=%{value}<extra></extra>";
+                layout.title = {text: "Total Success Launches by Site"};
+                return {data: [trace], layout: layout};
+            }
+            // Specific site: success vs failure counts
+            var counts = data.outcomes[site] || [0, 0];
+            var labels = [], values = [], colors = [];
+            [["Success", counts[0], "green"], ["Failure", counts[1], "red"]].forEach(function (o) {
+                if (o[1] > 0) {
+                    labels.push(o[0]);
+                    values.push(o[1]);
+                    colors.push(o[2]);
+                }
+            });
+            trace.labels = labels;
+            trace.values = values;
+            trace.customdata = labels.map(function (l) { return [l]; });
+            trace.marker = {colors: colors};
+            trace.hovertemplate = "Outcome=%{customdata[0]}<br>count=%{value}<extra></extra>";
+            layout.title = {text: "Total Launch Outcomes for " + site};
+            return {data: [trace], layout: layout};
+        },
+
+        scatter: function (site, payloadRange, data) {
+            if (!data) {
+                return window.dash_clientside.no_update;
+            }
+            var low = payloadRange[0], high = payloadRange[1];
+            var siteCode = site === "ALL" ? -1 : data.sites.indexOf(site);
+            // One trace per booster category, in order of first appearance (as px does)
+            var traces = [], byBooster = {};
+            for (var i = 0; i < data.payload.length; i++) {
+                var p = data.payload[i];
+                if (p === null || p < low || p > high) {
+                    continue;
+                }
+                if (siteCode !== -1 && data.site[i] !== siteCode) {
+                    continue;
+                }
+                // Rows without a booster (-1) or a class are left out, as on the server
+                var b = data.booster[i];
+                if (b < 0 || data["class"][i] === null) {
+                    continue;
+                }
+                var t = byBooster[b];
+                if (t === undefined) {
+                    var name = data.boosters[b];
+                    t = byBooster[b] = {
+                        type: "scatter", mode: "markers", name: name, legendgroup: name,
+                        showlegend: true, orientation: "v",
+                        marker: {color: data.colorway[traces.length % data.colorway.length], symbol: "circle"},
+                        hovertemplate: "Booster Version Category=" + name +
+                            "<br>Payload Mass (kg)=%{x}<br>class=%{y}<br>Launch Site=%{customdata[0]}<extra></extra>",
+                        x: [], y: [], customdata: []
+                    };
+                    traces.push(t);
+                }
+                t.x.push(p);
+                t.y.push(data["class"][i]);
+                t.customdata.push([data.sites[data.site[i]]]);
+            }
+            if (traces.length) {
+                // Same switch as the server: WebGL once there are more points than SVG draws quickly
+                var points = traces.reduce(function (n, t) { return n + t.x.length; }, 0);
+                traces.forEach(function (t) { t.type = points > data.webgl_points ? "scattergl" : "scatter"; });
+            }
+            var legend = {tracegroupgap: 0};
+            if (traces.length) {
+                // px only titles the legend when there is a trace
+                legend.title = {text: "Booster Version Category"};
+            }
+            return {
+                data: traces,
+                layout: {
+                    template: data.template,
+                    title: {
+                        text: site === "ALL"
+                            ? "Correlation between Payload and Success for All Sites"
+                            : "Correlation between Payload and Success for " + site
+                    },
+                    xaxis: {anchor: "y", domain: [0, 1], title: {text: "Payload Mass (kg)"}},
+                    yaxis: {
+                        anchor: "x", domain: [0, 1], title: {text: "class"},
+                        tickmode: "array", tickvals: [0, 1], ticktext: ["Failure", "Success"]
+                    },
+                    legend: legend
+                }
+            };
+        }
+    }
+});
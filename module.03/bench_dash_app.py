@@ -0,0 +1,266 @@
+"""Load-test the launch dashboard on synthetic launch tables.
+
+For each --rows size, a table shaped like spacex_launch_dash.csv is built by
+resampling the real launches. Payloads are jittered, so every row is new.
+The table is written as CSV or as the memory-mapped export the production
+server reads (dash_columns). Two drivers then replay the same randomized
+site, payload-range and filter inputs:
+
+  direct  calls update_pie / update_scatter / update_summary in-process
+  http    starts the app (gunicorn over wsgi.py, or the Flask dev server)
+          and POSTs the inputs to /_dash-update-component from
+          --concurrency client threads
+
+Each request list is replayed twice. The first pass is mostly memo misses,
+the second is all hits; --no-memo turns the figure memo off. The report
+gives throughput and p50/p95/p99 latency per callback.
+
+Usage:
+    python bench_dash_app.py --rows 1e3 1e5 1e6 --requests 300 --concurrency 8
+    python bench_dash_app.py --rows 1e7 --driver http --server gunicorn --workers 4
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import subprocess
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from dash_columns import export_columns
+from dash_data import BOOSTER_COL, PAYLOAD_COL, SITE_COL
+from dash_provider import DataProvider, load_spacex_dash
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAYLOAD_JITTER_KG = 300
+UPDATE_PATH = "/_dash-update-component"
+
+
+def generate_launches(rows: int, seed: int = 0, dates: bool = False) -> pd.DataFrame:
+    """`rows` launches resampled from the real table, with jittered payloads."""
+    rng = np.random.default_rng(seed)
+    real = load_spacex_dash()
+    df = real.iloc[rng.integers(0, len(real), rows)].reset_index(drop=True)
+    df["Unnamed: 0"] = np.arange(rows)
+    df["Flight Number"] = np.arange(1, rows + 1)
+    payload = df[PAYLOAD_COL].to_numpy(dtype=float) + rng.normal(0, PAYLOAD_JITTER_KG, rows)
+    df[PAYLOAD_COL] = np.clip(payload, 0, real[PAYLOAD_COL].max()).round(1)
+    if dates:
+        # The real table has no dates; these give the cube a year axis to filter on
+        df["Date"] = pd.Timestamp("2010-06-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")
+    return df
+
+
+def write_dataset(df: pd.DataFrame, out_dir: str, fmt: str) -> str:
+    if fmt == "csv":
+        path = os.path.join(out_dir, "launches.csv")
+        df.to_csv(path, index=False)
+        return path
+    path = os.path.join(out_dir, "launches.columns.json")
+    export_columns(df, path)
+    return path
+
+
+def workload(df: pd.DataFrame, count: int, seed: int, filters: bool) -> list[dict]:
+    """Widget values for `count` interactions: a site, a 1000 kg-step range and maybe filters."""
+    rng = random.Random(seed)
+    sites = ["ALL"] + sorted(df[SITE_COL].astype(str).unique())
+    boosters = sorted(df[BOOSTER_COL].astype(str).unique())
+    years = sorted(pd.to_datetime(df["Date"]).dt.year.unique().tolist()) if "Date" in df else []
+    inputs = []
+    for _ in range(count):
+        low = rng.randrange(0, 10000, 1000)
+        values = {
+            "site-dropdown.value": rng.choice(sites),
+            "payload-slider.value": [low, rng.randrange(low + 1000, 10001, 1000)],
+        }
+        if filters:
+            values["booster-filter.value"] = rng.sample(boosters, rng.randint(1, 2)) if rng.random() < 0.3 else None
+            values["outcome-filter.value"] = rng.choice([[1, 0], [1, 0], [1], [0]])
+            values["year-filter.value"] = rng.sample(years, 1) if years and rng.random() < 0.3 else None
+        inputs.append(values)
+    return inputs
+
+
+def summarize(latencies: list[float], wall: float) -> str:
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return f"{len(ms):6d} {len(ms) / wall:9.1f} {p50:9.2f} {p95:9.2f} {p99:9.2f}"
+
+
+HEADER = f"  {'driver':7s} {'pass':5s} {'callback':9s} {'n':>6s} {'req/s':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}"
+
+
+def run_direct(data_path: str, inputs: list[dict]) -> None:
+    import spacex_dash_app as dash_app
+    # Point the app at this dataset; the file does not change, so skip the watcher
+    dash_app.provider = DataProvider(data_path, check_interval=-1)
+    dash_app.figure_memo.clear()
+    start = time.perf_counter()
+    dash_app.provider.current()
+    print(f"  direct: snapshot loaded in {time.perf_counter() - start:.2f} s")
+
+    def args(values: dict, with_range: bool) -> list:
+        out = [values["site-dropdown.value"]] + ([values["payload-slider.value"]] if with_range else [])
+        if dash_app.FILTERS:
+            out += [values["booster-filter.value"], values["outcome-filter.value"], values["year-filter.value"]]
+        return out
+
+    callbacks = [("pie", dash_app.update_pie, False), ("scatter", dash_app.update_scatter, True)]
+    if dash_app.FILTERS:
+        callbacks.append(("summary", dash_app.update_summary, True))
+    for label in ("cold", "warm"):
+        for name, fn, with_range in callbacks:
+            latencies = []
+            start = time.perf_counter()
+            for values in inputs:
+                t = time.perf_counter()
+                fn(*args(values, with_range))
+                latencies.append(time.perf_counter() - t)
+            print(f"  {'direct':7s} {label:5s} {name:9s} {summarize(latencies, time.perf_counter() - start)}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_path: str, server: str, workers: int, port: int, env_extra: dict) -> subprocess.Popen:
+    env = dict(os.environ, SPACEX_DASH_DATA=data_path, **env_extra)
+    if server == "gunicorn":
+        env.update(SPACEX_DASH_BIND=f"127.0.0.1:{port}", SPACEX_DASH_WORKERS=str(workers))
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:server"]
+    else:
+        # Flask's threaded dev server without the reloader or debug tooling
+        cmd = [sys.executable, "-c",
+               f"from spacex_dash_app import app; app.run(host='127.0.0.1', port={port}, debug=False)"]
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{server} exited: {proc.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+            # The layout needs the snapshot, so this also waits for the data to load
+            conn.request("GET", "/_dash-layout")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{server} did not answer on port {port}")
+
+
+def callback_bodies(port: int, inputs: list[dict]) -> dict[str, list[bytes]]:
+    """Request bodies per server callback, built from /_dash-dependencies."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request("GET", "/_dash-dependencies")
+    deps = json.loads(conn.getresponse().read())
+    conn.close()
+    names = {"success-pie-chart": "pie", "success-payload-scatter-chart": "scatter", "filter-summary": "summary"}
+    bodies = {}
+    for dep in deps:
+        if dep.get("clientside_function"):
+            continue
+        component, prop = dep["output"].rsplit(".", 1)
+        bodies[names.get(component, component)] = [json.dumps({
+            "output": dep["output"],
+            "outputs": {"id": component, "property": prop},
+            "inputs": [{"id": i["id"], "property": i["property"], "value": values[f"{i['id']}.{i['property']}"]}
+                       for i in dep["inputs"]],
+            "changedPropIds": [f"{dep['inputs'][0]['id']}.{dep['inputs'][0]['property']}"],
+            "state": [],
+        }).encode("utf-8") for values in inputs]
+    return bodies
+
+
+def run_http(data_path: str, inputs: list[dict], server: str, workers: int, concurrency: int,
+             env_extra: dict) -> None:
+    port = free_port()
+    start = time.perf_counter()
+    proc = start_server(data_path, server, workers, port, env_extra)
+    print(f"  http: {server} ready in {time.perf_counter() - start:.2f} s, {concurrency} clients")
+    try:
+        bodies = callback_bodies(port, inputs)
+        if not bodies:
+            print("  http: no server callbacks (clientside mode)")
+            return
+        for label in ("cold", "warm"):
+            for name, payloads in bodies.items():
+                chunks = [payloads[i::concurrency] for i in range(concurrency)]
+
+                def client(chunk: list[bytes]) -> list[float]:
+                    # One keep-alive connection per client thread
+                    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+                    latencies = []
+                    for body in chunk:
+                        t = time.perf_counter()
+                        conn.request("POST", UPDATE_PATH, body, {"Content-Type": "application/json"})
+                        resp = conn.getresponse()
+                        resp.read()
+                        if resp.status not in (200, 204):
+                            raise RuntimeError(f"{name}: HTTP {resp.status}")
+                        latencies.append(time.perf_counter() - t)
+                    conn.close()
+                    return latencies
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    latencies = [t for part in pool.map(client, chunks) for t in part]
+                print(f"  {'http':7s} {label:5s} {name:9s} {summarize(latencies, time.perf_counter() - start)}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", nargs="+", type=lambda s: int(float(s)), default=[1000, 10000, 100000, 1000000],
+                        help="table sizes to test, e.g. 1e3 1e6")
+    parser.add_argument("--format", choices=["columns", "csv"], default="columns", help="how the table is stored")
+    parser.add_argument("--dates", action="store_true", help="add a Date column (year filter)")
+    parser.add_argument("--driver", choices=["direct", "http", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=200, help="interactions per callback and pass")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent HTTP clients")
+    parser.add_argument("--server", choices=["gunicorn", "flask"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="gunicorn workers")
+    parser.add_argument("--no-memo", action="store_true", help="turn the figure memo off")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env_extra = {"SPACEX_DASH_RELOAD_SECONDS": "-1", "SPACEX_DASH_CACHE_DIR": ""}
+    if args.no_memo:
+        env_extra["SPACEX_DASH_CACHE_SIZE"] = "0"
+    # The in-process driver reads the same settings when it imports the app
+    os.environ.update(env_extra)
+    filters = os.environ.get("SPACEX_DASH_FILTERS", "1") == "1" and os.environ.get("SPACEX_DASH_CLIENTSIDE") != "1"
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            df = generate_launches(rows, args.seed, args.dates)
+            path = write_dataset(df, tmp, args.format)
+            print(f"=== {rows:,} rows ({args.format}, {time.perf_counter() - start:.1f} s to generate)")
+            inputs = workload(df, args.requests, args.seed, filters)
+            del df
+            print(HEADER)
+            if args.driver in ("direct", "both"):
+                run_direct(path, inputs)
+            if args.driver in ("http", "both"):
+                run_http(path, inputs, args.server, args.workers, args.concurrency, env_extra)
+            print()
+
+
+if __name__ == "__main__":
+    main()
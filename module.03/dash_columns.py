@@ -0,0 +1,134 @@
+"""Read-only, memory-mapped columnar copy of the launch table.
+
+export_columns writes each column of the table to its own .npy file. Text
+columns are stored as integer codes into their sorted distinct values. A
+small JSON manifest lists the files, the categories and the data version.
+The payload order behind the dashboard's range index is exported the same
+way, so no worker has to sort or hash the table. read_export maps all of
+it read-only (np.load with mmap_mode="r"), so
+every worker process serving the dashboard shares one copy of the data
+through the page cache instead of parsing its own pandas frame. The
+manifest is replaced atomically, so point SPACEX_DASH_DATA at it and the
+running workers pick up each new export (see dash_provider).
+
+Usage:
+    python dash_columns.py spacex_launch_dash.csv [spacex_launch_dash.columns.json]
+"""
+from __future__ import annotations
+import os
+import sys
+import glob
+import json
+import tempfile
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from dash_data import PayloadOrder, data_version, payload_order
+
+MANIFEST_SUFFIX = ".columns.json"
+ORDER_ARRAYS = ("site_rows", "site_payload", "all_rows", "all_payload")
+
+
+class ColumnExport(NamedTuple):
+    df: pd.DataFrame
+    version: str
+    order: PayloadOrder
+
+
+def manifest_path_for(table: str) -> str:
+    return os.path.splitext(table)[0] + MANIFEST_SUFFIX
+
+
+def _column_file(manifest: str, version: str, key: int | str) -> str:
+    stem = os.path.basename(manifest)[:-len(MANIFEST_SUFFIX)]
+    return f"{stem}.{version}.{key}.npy"
+
+
+def _save_array(root: str, file: str, arr: np.ndarray) -> None:
+    # Files are named by version, so an existing one already holds this data
+    if os.path.exists(os.path.join(root, file)):
+        return
+    fd, tmp = tempfile.mkstemp(dir=root, suffix=".npy.tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, np.ascontiguousarray(arr))
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, os.path.join(root, file))
+
+
+def export_columns(df: pd.DataFrame, manifest: str) -> str:
+    """Write `df` as memory-mappable columns next to `manifest`; returns the data version."""
+    root = os.path.dirname(os.path.abspath(manifest))
+    version = data_version(df)
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name]
+        categories = None
+        if values.dtype.kind in "biuf":
+            arr = values.to_numpy()
+        else:
+            # Sorted categories keep groupby order and px trace order the same as for text;
+            # missing values get code -1
+            codes, uniques = pd.factorize(values, sort=True)
+            categories = [str(u) for u in uniques]
+            # Store codes in the width pandas uses, so from_codes can wrap the map without a copy
+            arr = pd.Categorical.from_codes(codes, categories).codes
+        file = _column_file(manifest, version, i)
+        _save_array(root, file, arr)
+        columns.append({"name": str(name), "file": file, "categories": categories})
+
+    order = payload_order(df)
+    order_files = {}
+    for key in ORDER_ARRAYS:
+        order_files[key] = _column_file(manifest, version, key)
+        _save_array(root, order_files[key], getattr(order, key))
+
+    fd, tmp = tempfile.mkstemp(dir=root, suffix=".json.tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "rows": len(df), "columns": columns,
+                   "payload_order": {"files": order_files, "bounds": order.bounds}}, f)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, manifest)
+
+    # Drop older exports; workers still mapping them keep their pages until they reload
+    keep = {c["file"] for c in columns} | set(order_files.values())
+    stem = os.path.basename(manifest)[:-len(MANIFEST_SUFFIX)]
+    for path in glob.glob(os.path.join(root, glob.escape(stem) + ".*.npy")):
+        if os.path.basename(path) not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return version
+
+
+def read_export(manifest: str) -> ColumnExport:
+    """The exported table, version and payload order, with all arrays as read-only memory maps."""
+    root = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    data = {}
+    for col in meta["columns"]:
+        arr = np.load(os.path.join(root, col["file"]), mmap_mode="r")
+        if col["categories"] is not None:
+            arr = pd.Categorical.from_codes(arr, pd.Index(col["categories"], dtype=object))
+        data[col["name"]] = arr
+    # copy=False keeps each column a view of its map instead of consolidating into new blocks
+    df = pd.DataFrame(data, copy=False)
+    meta_order = meta["payload_order"]
+    arrays = {key: np.load(os.path.join(root, file), mmap_mode="r") for key, file in meta_order["files"].items()}
+    bounds = {site: (lo, hi) for site, (lo, hi) in meta_order["bounds"].items()}
+    return ColumnExport(df, meta["version"], PayloadOrder(bounds=bounds, **arrays))
+
+
+def read_columns(manifest: str) -> pd.DataFrame:
+    return read_export(manifest).df
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit(__doc__.strip().splitlines()[-1])
+    table = sys.argv[1]
+    out = sys.argv[2] if len(sys.argv) == 3 else manifest_path_for(table)
+    print(f"{out}: version {export_columns(pd.read_csv(table), out)}")
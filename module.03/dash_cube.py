@@ -0,0 +1,86 @@
+"""Pre-aggregated launch counts for the dashboard's cross-filters.
+
+DataCube holds, for every (site, booster category, payload bucket, year)
+cell, the number of launches and of successes. It is built with one
+bincount when a snapshot is built. A filter combination is a selection
+along each axis and is answered by summing the selected cells, so its cost
+depends on the number of cells, not on the number of launches. Launches
+without a payload, booster category or year sit in an extra last bucket of
+that axis, so an unfiltered axis counts every launch with a site and an
+outcome, as the per-site pie outcomes do; selecting codes leaves them out.
+Tables without a Year or Date column get a single year bucket.
+"""
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PAYLOAD_BUCKET_KG = 1000
+YEAR_COL = "Year"
+DATE_COL = "Date"
+
+
+@dataclass(frozen=True)
+class DataCube:
+    # int64 arrays shaped (sites, boosters + 1, payload buckets + 1, years + 1); without dates years + 1 is 1
+    launches: np.ndarray
+    successes: np.ndarray
+    bucket_kg: float = PAYLOAD_BUCKET_KG
+
+    def totals(self, sites: Optional[Sequence[int]] = None, boosters: Optional[Sequence[int]] = None,
+               buckets: Optional[Sequence[int]] = None, years: Optional[Sequence[int]] = None,
+               by_site: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """(launches, successes) summed over the selected cells; None selects a whole axis."""
+        index = np.ix_(*[
+            np.arange(n) if sel is None else np.asarray(sel, dtype=np.intp)
+            for sel, n in zip((sites, boosters, buckets, years), self.launches.shape)
+        ])
+        axis = (1, 2, 3) if by_site else None
+        return self.launches[index].sum(axis=axis), self.successes[index].sum(axis=axis)
+
+    def full_buckets(self, low: float, high: float) -> np.ndarray:
+        """Payload buckets lying entirely inside [low, high]."""
+        known = self.launches.shape[2] - 1
+        first = max(math.ceil(low / self.bucket_kg), 0)
+        last = min(math.floor(high / self.bucket_kg) - 1, known - 1)
+        return np.arange(first, last + 1)
+
+
+def year_codes(df: pd.DataFrame) -> tuple[Optional[np.ndarray], tuple[int, ...]]:
+    """Per-row codes into the sorted launch years, or (None, ()) when the table has no dates."""
+    if YEAR_COL in df:
+        years = pd.to_numeric(df[YEAR_COL], errors="coerce")
+    elif DATE_COL in df:
+        years = pd.to_datetime(df[DATE_COL], errors="coerce").dt.year
+    else:
+        return None, ()
+    codes, uniques = pd.factorize(years.astype("Int64"), sort=True)
+    return codes, tuple(int(y) for y in uniques)
+
+
+def build_cube(site_codes: np.ndarray, n_sites: int, booster_codes: np.ndarray, n_boosters: int,
+               payload: np.ndarray, outcome: np.ndarray, years: Optional[np.ndarray], n_years: int,
+               bucket_kg: float = PAYLOAD_BUCKET_KG) -> DataCube:
+    payload = np.asarray(payload, dtype=float)
+    outcome = np.asarray(outcome, dtype=float)
+    known = ~np.isnan(payload)
+    buckets = int(np.nanmax(payload) // bucket_kg) + 1 if known.any() else 0
+    bucket = np.full(len(payload), buckets, dtype=np.int64)
+    bucket[known] = np.clip(payload[known] // bucket_kg, 0, None).astype(np.int64)
+    # Missing category or year go to the catch-all last bucket of their axis
+    booster = np.where(booster_codes >= 0, booster_codes, n_boosters)
+    if years is None:
+        year, n_year_cells = np.zeros(len(payload), dtype=np.int64), 1
+    else:
+        year, n_year_cells = np.where(years >= 0, years, n_years), n_years + 1
+    # Launches missing a site or outcome have no cell, as in the per-site outcomes
+    valid = (site_codes >= 0) & ~np.isnan(outcome)
+    shape = (n_sites, n_boosters + 1, buckets + 1, n_year_cells)
+    flat = np.ravel_multi_index((site_codes[valid], booster[valid], bucket[valid], year[valid]), shape)
+    size = math.prod(shape)
+    launches = np.bincount(flat, minlength=size).reshape(shape)
+    successes = np.bincount(flat, weights=outcome[valid], minlength=size).round().astype(np.int64).reshape(shape)
+    return DataCube(launches, successes, bucket_kg)
@@ -0,0 +1,246 @@
+"""Immutable, precomputed views of the launch table for the dashboard callbacks.
+
+A DashSnapshot is built once each time spacex_launch_dash.csv is loaded. It
+holds the frame plus the aggregates the callbacks need, such as success and
+failure counts per site, so a callback does a lookup instead of a scan.
+Row positions are also indexed per site (and for ALL) in payload order, so
+a payload range becomes two binary searches and one slice.
+Callbacks read the current snapshot through a single reference. A reload
+builds a complete new snapshot and swaps it in with one assignment, so a
+callback sees either the old data or the new, never a mix.
+"""
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from dash_cube import DataCube, build_cube, year_codes
+
+SITE_COL = "Launch Site"
+CLASS_COL = "class"
+PAYLOAD_COL = "Payload Mass (kg)"
+BOOSTER_COL = "Booster Version Category"
+ALL_SITES = "ALL"
+
+
+@dataclass(frozen=True)
+class PayloadIndex:
+    # Payloads in ascending order and the frame positions they came from
+    payload: np.ndarray
+    rows: np.ndarray
+
+    def query(self, low: float, high: float) -> np.ndarray:
+        """Positions of the rows with low <= payload <= high, in O(log n + k)."""
+        lo = np.searchsorted(self.payload, low, side="left")
+        hi = np.searchsorted(self.payload, high, side="right")
+        return self.rows[lo:hi]
+
+    def query_around(self, low: float, high: float, inner_low: float, inner_high: float) -> np.ndarray:
+        """Positions with low <= payload <= high but outside [inner_low, inner_high)."""
+        lo, a, b = np.searchsorted(self.payload, [low, inner_low, inner_high], side="left")
+        hi = np.searchsorted(self.payload, high, side="right")
+        return np.concatenate([self.rows[lo:max(a, lo)], self.rows[max(b, lo):hi]])
+
+
+@dataclass(frozen=True)
+class DashSnapshot:
+    df: pd.DataFrame
+    sites: tuple[str, ...]
+    # site -> (successes, failures)
+    outcomes: Mapping[str, tuple[int, int]]
+    payload_min: int
+    payload_max: int
+    # site (or ALL) -> payload-sorted row positions
+    payload_index: Mapping[str, PayloadIndex]
+    # Content hash of the frame; the same data gives the same version in every worker
+    version: str
+    # Per-row codes into site_names and boosters (-1 where missing)
+    site_codes: np.ndarray
+    site_names: tuple[str, ...]
+    booster_codes: np.ndarray
+    boosters: tuple[str, ...]
+    # Per-row codes into years; None when the table has no launch dates
+    year_codes: Optional[np.ndarray]
+    years: tuple[int, ...]
+    # Launch and success counts per (site, booster, payload bucket, year) cell
+    cube: DataCube
+
+    def payload_positions(self, site: str, low: float, high: float) -> np.ndarray:
+        """Positions of the rows of `site` (or ALL) with payload in [low, high], in table order."""
+        index = self.payload_index.get(site)
+        if index is None:
+            return np.empty(0, dtype=np.intp)
+        # Back to table order, so plotly sees the rows (and trace order) as before
+        return np.sort(index.query(low, high))
+
+    def payload_rows(self, site: str, low: float, high: float) -> pd.DataFrame:
+        """Rows of `site` (or ALL) with payload in [low, high], in their original order."""
+        return self.df.iloc[self.payload_positions(site, low, high)]
+
+    def row_mask(self, rows: np.ndarray, boosters: Optional[Sequence[int]] = None,
+                 outcomes: Optional[Sequence[int]] = None, years: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Which of `rows` match the booster-code, class and year-code filters (None: any)."""
+        mask = np.ones(len(rows), dtype=bool)
+        if boosters is not None:
+            mask &= np.isin(self.booster_codes[rows], boosters)
+        if outcomes is not None:
+            mask &= np.isin(self.df[CLASS_COL].to_numpy()[rows], outcomes)
+        if years is not None and self.year_codes is not None:
+            mask &= np.isin(self.year_codes[rows], years)
+        return mask
+
+    def filtered_outcomes(self, boosters: Optional[Sequence[int]] = None, outcomes: Optional[Sequence[int]] = None,
+                          years: Optional[Sequence[int]] = None) -> Mapping[str, tuple[int, int]]:
+        """site -> (successes, failures) among the launches matching the filters, from the cube."""
+        if boosters is None and outcomes is None and years is None:
+            return self.outcomes
+        launches, successes = self.cube.totals(boosters=boosters, years=self._cube_years(years), by_site=True)
+        counts = {}
+        for i, site in enumerate(self.site_names):
+            ok, failed = int(successes[i]), int(launches[i] - successes[i])
+            counts[site] = _keep_outcomes(ok, failed, outcomes)
+        return counts
+
+    def launch_counts(self, site: str, low: float, high: float, boosters: Optional[Sequence[int]] = None,
+                      outcomes: Optional[Sequence[int]] = None,
+                      years: Optional[Sequence[int]] = None) -> tuple[int, int]:
+        """(successes, failures) of `site` (or ALL) in [low, high] kg matching the filters.
+
+        Whole payload buckets come from the cube; only the launches in the
+        partly covered buckets at either end of the range are looked at.
+        """
+        index = self.payload_index.get(site)
+        if index is None:
+            return 0, 0
+        sites = None if site == ALL_SITES else [self.site_names.index(site)]
+        full = self.cube.full_buckets(low, high)
+        launches, successes = self.cube.totals(sites, boosters, full, self._cube_years(years))
+        if len(full):
+            edge = index.query_around(low, high, full[0] * self.cube.bucket_kg, (full[-1] + 1) * self.cube.bucket_kg)
+        else:
+            edge = index.query(low, high)
+        # The cube leaves out launches without a site or outcome; so do the edges
+        outcome = self.df[CLASS_COL].to_numpy()[edge].astype(float)
+        valid = (self.site_codes[edge] >= 0) & ~np.isnan(outcome)
+        edge_ok = valid & self.row_mask(edge, boosters, None, years)
+        ok = int(successes) + int(outcome[edge_ok].sum())
+        failed = int(launches) - int(successes) + int(np.count_nonzero(edge_ok)) - int(outcome[edge_ok].sum())
+        return _keep_outcomes(ok, failed, outcomes)
+
+    def _cube_years(self, years: Optional[Sequence[int]]) -> Optional[Sequence[int]]:
+        # Without dates the cube has a single year bucket, which every filter keeps
+        return None if self.year_codes is None else years
+
+
+def _keep_outcomes(ok: int, failed: int, outcomes: Optional[Sequence[int]]) -> tuple[int, int]:
+    if outcomes is None:
+        return ok, failed
+    return (ok if 1 in outcomes else 0), (failed if 0 in outcomes else 0)
+
+
+@dataclass(frozen=True)
+class PayloadOrder:
+    # Rows with a payload sorted by (site, payload), each site's run in them,
+    # and the same rows sorted by payload alone; payloads alongside, in that order
+    site_rows: np.ndarray
+    site_payload: np.ndarray
+    bounds: Mapping[str, tuple[int, int]]
+    all_rows: np.ndarray
+    all_payload: np.ndarray
+
+
+def minmax_sample(values: np.ndarray, budget: int) -> np.ndarray:
+    """Sorted positions of at most `budget` entries of `values`: the min and max of each of budget // 2 bins."""
+    # Keeping both ends of every bin preserves the extent, gaps and clusters of a scatter
+    if len(values) <= budget:
+        return np.arange(len(values))
+    bins = max(budget // 2, 1)
+    lo, hi = float(values.min()), float(values.max())
+    scale = bins / (hi - lo) if hi > lo else 0.0
+    which = np.minimum(((values - lo) * scale).astype(np.int64), bins - 1)
+    # Sort by (bin, value); the first and last entry of each bin's run are its min and max
+    order = np.lexsort((values, which))
+    starts = np.flatnonzero(np.r_[True, np.diff(which[order]) != 0])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def payload_order(df: pd.DataFrame) -> PayloadOrder:
+    payload = df[PAYLOAD_COL].to_numpy(dtype=float)
+    # NaN payloads can never fall inside a range; leave them out of the index
+    valid = np.flatnonzero(~np.isnan(payload))
+    codes, sites = pd.factorize(df[SITE_COL].to_numpy()[valid], sort=True)
+    # Sort by (site, payload) once; each site is then one contiguous run
+    order = np.lexsort((payload[valid], codes))
+    site_rows = valid[order]
+    edges = np.searchsorted(codes[order], np.arange(len(sites) + 1))
+    all_rows = valid[np.argsort(payload[valid], kind="stable")]
+    return PayloadOrder(
+        site_rows=site_rows,
+        site_payload=payload[site_rows],
+        bounds={str(site): (int(edges[i]), int(edges[i + 1])) for i, site in enumerate(sites)},
+        all_rows=all_rows,
+        all_payload=payload[all_rows],
+    )
+
+
+def _payload_index(order: PayloadOrder) -> dict[str, PayloadIndex]:
+    # Slices are views, so memory-mapped orders stay shared between processes
+    index = {
+        site: PayloadIndex(order.site_payload[lo:hi], order.site_rows[lo:hi])
+        for site, (lo, hi) in order.bounds.items()
+    }
+    index[ALL_SITES] = PayloadIndex(order.all_payload, order.all_rows)
+    return index
+
+
+def column_codes(values: pd.Series) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Integer codes and their labels for a text column; -1 marks a missing value."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # A (memory-mapped) categorical already has them; no per-row copy
+        return values.cat.codes.to_numpy(), tuple(map(str, values.cat.categories))
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, tuple(map(str, uniques))
+
+
+def data_version(df: pd.DataFrame) -> str:
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    columns = "\x1f".join(map(str, df.columns)).encode("utf-8")
+    return hashlib.sha1(columns + hashed.tobytes()).hexdigest()[:16]
+
+
+def build_snapshot(df: pd.DataFrame, version: str | None = None,
+                   order: PayloadOrder | None = None) -> DashSnapshot:
+    """Snapshot of `df`; pass a precomputed version and payload order to skip hashing and sorting."""
+    # One grouped pass gives both pie charts' numbers for every site
+    grouped = df.groupby(SITE_COL)[CLASS_COL].agg(["sum", "count"]).sort_index()
+    outcomes = {
+        str(site): (int(row["sum"]), int(row["count"] - row["sum"]))
+        for site, row in grouped.iterrows()
+    }
+    payload = df[PAYLOAD_COL]
+    site_codes, site_names = column_codes(df[SITE_COL])
+    booster_codes, boosters = column_codes(df[BOOSTER_COL])
+    years, year_labels = year_codes(df)
+    cube = build_cube(site_codes, len(site_names), booster_codes, len(boosters),
+                      payload.to_numpy(dtype=float), df[CLASS_COL].to_numpy(dtype=float), years, len(year_labels))
+    return DashSnapshot(
+        df=df,
+        sites=tuple(outcomes),
+        outcomes=MappingProxyType(outcomes),
+        payload_min=int(payload.min()) if len(df) else 0,
+        payload_max=int(payload.max()) if len(df) else 0,
+        payload_index=MappingProxyType(_payload_index(order or payload_order(df))),
+        version=version or data_version(df),
+        site_codes=site_codes,
+        site_names=site_names,
+        booster_codes=booster_codes,
+        boosters=boosters,
+        year_codes=years,
+        years=year_labels,
+        cube=cube,
+    )
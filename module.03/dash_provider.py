@@ -0,0 +1,158 @@
+"""Lazy, hot-reloading source of DashSnapshots for the dashboard.
+
+Nothing is read when the module is imported. The first call to
+DataProvider.current() loads the launch table (downloading it once if the
+local copy is missing) and builds the snapshot. After that, current()
+stats the data file at most every `check_interval` seconds. When the
+file's mtime or size changes, a background thread builds a new snapshot
+and swaps it in. Requests keep getting the old
+snapshot until then, so a refresh never blocks the dashboard. A file that fails to parse is
+logged and skipped, and the last good snapshot stays in place.
+"""
+from __future__ import annotations
+import os
+import time
+import logging
+import threading
+from typing import Callable, Optional
+
+import requests
+import pandas as pd
+
+from dash_data import DashSnapshot, build_snapshot
+from dash_columns import MANIFEST_SUFFIX, read_columns, read_export
+
+DATA_URL = (
+    "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
+    "IBM-DS0321EN-SkillsNetwork/datasets/spacex_launch_dash.csv"
+)
+DATA_LOCAL = os.path.join(os.path.dirname(__file__), "spacex_launch_dash.csv")
+CHECK_INTERVAL = 2.0
+
+log = logging.getLogger(__name__)
+
+
+def load_spacex_dash(url: str = DATA_URL, local: str = DATA_LOCAL) -> pd.DataFrame:
+    """Load SpaceX Dash CSV with local cache.
+    Tries local file first; if missing, downloads from URL.
+    """
+    if os.path.exists(local):
+        return read_table(local)
+    # Download and save
+    try:
+        r = requests.get(url, timeout=30)
+        r.raise_for_status()
+        with open(local, "wb") as f:
+            f.write(r.content)
+    except Exception as e:
+        # Fall back to direct read from URL
+        try:
+            return pd.read_csv(url)
+        except Exception:
+            raise RuntimeError(f"Failed to load dataset from {url} or local cache: {e}")
+    return read_table(local)
+
+
+def read_table(path: str) -> pd.DataFrame:
+    # Columnar copies load without a CSV parse (parquet needs pyarrow or fastparquet)
+    if path.endswith(MANIFEST_SUFFIX):
+        return read_columns(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+class DataProvider:
+    def __init__(self, path: str = DATA_LOCAL, url: Optional[str] = DATA_URL,
+                 check_interval: float = CHECK_INTERVAL,
+                 loader: Optional[Callable[[str], pd.DataFrame]] = None):
+        self.path = path
+        self.url = url
+        self.check_interval = check_interval
+        self.loader = loader
+        self._snapshot: Optional[DashSnapshot] = None
+        self._stamp: Optional[tuple[int, int]] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        # Called with each new snapshot after it is swapped in
+        self._listeners: list[Callable[[DashSnapshot], None]] = []
+
+    def on_change(self, listener: Callable[[DashSnapshot], None]) -> None:
+        self._listeners.append(listener)
+
+    def _file_stamp(self) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self) -> pd.DataFrame:
+        if self.loader is not None:
+            return self.loader(self.path)
+        if self.url and self.path.endswith(".csv"):
+            return load_spacex_dash(self.url, self.path)
+        return read_table(self.path)
+
+    def _build(self) -> DashSnapshot:
+        if self.loader is None and self.path.endswith(MANIFEST_SUFFIX):
+            # An export carries its version and payload order; nothing to hash or sort
+            return build_snapshot(*read_export(self.path))
+        return build_snapshot(self.load())
+
+    def _swap(self, snap: DashSnapshot, stamp: Optional[tuple[int, int]]) -> DashSnapshot:
+        # One assignment; callbacks holding the old snapshot finish with it
+        self._snapshot = snap
+        self._stamp = stamp
+        for listener in self._listeners:
+            listener(snap)
+        return snap
+
+    def current(self) -> DashSnapshot:
+        """The latest snapshot, loading on first use and reloading when the file changed."""
+        snap = self._snapshot
+        if snap is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    # Stamp before reading, so a write during the load is picked up next check
+                    stamp = self._file_stamp()
+                    self._swap(self._build(), stamp or self._file_stamp())
+                    self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+        if self.check_interval >= 0 and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            if self._file_stamp() not in (None, self._stamp):
+                # Rebuild in the background; this request is answered from the current snapshot
+                threading.Thread(target=self.check, daemon=True).start()
+        return snap
+
+    def check(self) -> bool:
+        """Reload if the data file changed since the last load; True when a new snapshot was swapped in."""
+        # Only one thread rebuilds; the others carry on with the current snapshot
+        if self._snapshot is None or not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp:
+                return False
+            try:
+                snap = self._build()
+            except Exception as e:
+                log.warning("Keeping data version %s; reloading %s failed: %s",
+                            self._snapshot.version, self.path, e)
+                # Do not retry the same broken file on every check
+                self._stamp = stamp
+                return False
+            if snap.version == self._snapshot.version:
+                # Touched but unchanged; keep the memoized figures
+                self._stamp = stamp
+                return False
+            self._swap(snap, stamp)
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def replace(self, df: pd.DataFrame) -> DashSnapshot:
+        """Swap in a snapshot of `df` directly, e.g. data that did not come from the file."""
+        with self._reload_lock:
+            return self._swap(build_snapshot(df), self._file_stamp())
@@ -0,0 +1,109 @@
+"""Memoized figure and Dash Patch JSON for the dashboard callbacks.
+
+FigureMemo keeps the serialized figure for each callback key in a bounded
+in-process LRU. Keys include the snapshot's data version, so a reload can
+never serve a figure of the old data; a data reload also clears the LRU. With
+a cache directory, figures are also written to <dir>/<version>/<key>.json,
+so all workers of a multi-process deployment share one cache. The disk
+cache is best effort: another worker may delete a version directory while
+this one reads or writes it, and then the figure is served from memory.
+"""
+from __future__ import annotations
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from plotly.io.json import to_json_plotly
+
+
+class FigureMemo:
+    def __init__(self, maxsize: int = 256, cache_dir: Optional[str] = None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._lru: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: tuple) -> str:
+        # key[1] is the data version; one directory per version
+        name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, str(key[1]), f"{name}.json")
+
+    def _remember(self, key: tuple, text: str) -> None:
+        with self._lock:
+            self._lru[key] = text
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def _read_disk(self, key: tuple) -> Optional[str]:
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            # Not cached yet, or removed by another worker's clear()
+            return None
+
+    def _write_disk(self, key: tuple, text: str) -> None:
+        path = self._disk_path(key)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            # The version directory can vanish under a concurrent clear(); the figure is still served
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def get_or_build(self, key: tuple, build: Callable[[], Any]) -> dict[str, Any]:
+        """Figure (or Patch) dict for `key` = (callback, version, *args), building it on a miss."""
+        with self._lock:
+            text = self._lru.get(key)
+            if text is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+        if text is None and self.cache_dir:
+            text = self._read_disk(key)
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, text)
+        if text is None:
+            text = to_json_plotly(build())
+            with self._lock:
+                self.misses += 1
+            self._remember(key, text)
+            if self.cache_dir:
+                self._write_disk(key, text)
+        return json.loads(text)
+
+    def clear(self, keep_version: Optional[str] = None) -> None:
+        """Drop the in-process LRU and, on disk, every data version except `keep_version`."""
+        with self._lock:
+            self._lru.clear()
+        if self.cache_dir:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+            for name in names:
+                if name != keep_version:
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "size": len(self._lru), "maxsize": self.maxsize}
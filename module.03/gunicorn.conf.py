@@ -0,0 +1,12 @@
+"""gunicorn settings for the dashboard: gunicorn -c gunicorn.conf.py wsgi:server"""
+import os
+import multiprocessing
+
+bind = os.environ.get("SPACEX_DASH_BIND", "127.0.0.1:8050")
+# Callbacks are CPU-bound Python, so scale with processes rather than threads
+workers = int(os.environ.get("SPACEX_DASH_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("SPACEX_DASH_THREADS", 2))
+worker_class = "gthread"
+# Import the app (and map the data) once in the master; workers fork with it loaded
+preload_app = True
+timeout = 60
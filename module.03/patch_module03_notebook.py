@@ -1,11 +1,14 @@
-import nbformat as nbf
 from pathlib import Path
-import shutil
-from datetime import datetime
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'tools'))
+from notebook_backup import backup_notebook
+from notebook_patch import NotebookPatcher, Rule, format_report, write_notebook
 
 NB_REL = Path('module.03') / 'lab_jupyter_launch_site_location.ipynb'
 NB_PATH = Path.cwd() / NB_REL
-BACKUP_PATH = NB_PATH.with_suffix('.backup.ipynb')
+# The only notebook these rules are written for (see tools/notebook_patch.py)
+NOTEBOOKS = (NB_REL.as_posix(),)
 
 LOADER_CODE = '''import os
 import requests
@@ -128,135 +131,63 @@ site_map
 '''
 
 
+MAP_LOOP_ONLY_CODE = (
+    "try:\n"
+    "    site_map\n"
+    "except NameError:\n"
+    "    print('Note: Run the initial map cell above to create site_map.')\n"
+)
+
+# Checked in order; the first rule matching a cell wins
+RULES = [
+    # Remove piplite cell
+    Rule('removed piplite cell', ('import piplite', 'await piplite.install'), None),
+    # Replace JS fetch loader
+    Rule('replaced CSV loader', ('from js import fetch',), LOADER_CODE, requires=('spacex_df',)),
+    # Replace Initial the map cell
+    Rule('replaced initial map cell', ('site_map = folium.Map(location=nasa_coordinate, zoom_start=5)',),
+         SAFETY_MAP_CODE, requires=('Initial the map',)),
+    # Some course notebooks split the loop from the map init. If we find the loop-only cell,
+    # neutralize it to just display the map to prevent NameErrors.
+    Rule('map loop-only neutralized', ('# For each launch site, add a Circle object based on its coordinate',),
+         MAP_LOOP_ONLY_CODE, requires=('launch_sites_df.iterrows()',)),
+    # If a previous patch left a cell with only `site_map`, make it safe too
+    Rule('map display neutralized', ('site_map',), MAP_LOOP_ONLY_CODE, mode='exact'),
+    # Marker color creation cell
+    Rule('added marker_color cell', ('Apply a function to check the value of `class` column', 'marker_color value'),
+         MARKER_COLOR_CODE),
+    # Marker cluster loop cell; only replaced while it still has a TODO inside
+    Rule('filled marker cluster', ('site_map.add_child(marker_cluster)',), MARKER_CLUSTER_CODE,
+         requires=('marker_cluster.add_child(marker)',), requires_any=('TODO', 'marker = folium.Marker(...')),
+    # Coastline distance cell
+    Rule('coastline distance calc', ('# find coordinate of the closet coastline',), COASTLINE_DISTANCE_CODE),
+    # Coastline marker cell
+    Rule('coastline marker', ('# Create and add a folium.Marker on your selected closest coastline point on the map',),
+         COASTLINE_MARKER_CODE),
+    # Polyline cell
+    Rule('polyline added', ('folium.PolyLine',), POLYLINE_CODE, requires=('site_map.add_child(lines)',)),
+]
+
+
 def main():
     if not NB_PATH.exists():
         raise FileNotFoundError(f"Notebook not found: {NB_PATH}")
 
-    # Backup (do not overwrite an existing one)
-    backup_target = BACKUP_PATH
-    if BACKUP_PATH.exists():
-        ts = datetime.now().strftime('%Y%m%d-%H%M%S')
-        backup_target = NB_PATH.with_suffix(f'.backup.{ts}.ipynb')
-    shutil.copyfile(NB_PATH, backup_target)
-
-    nb = nbf.read(str(NB_PATH), as_version=4)
-
-    skipped_piplite = False
-    replaced_loader = False
-    replaced_map = False
-    replaced_marker_color = False
-    replaced_cluster = False
-    replaced_coast = False
-    replaced_coast_marker = False
-    replaced_polyline = False
-    replaced_map_loop_only = False
-
-    new_cells = []
-    for cell in nb.cells:
-        if cell.cell_type != 'code':
-            new_cells.append(cell)
-            continue
-        src = cell.source or ''
-
-        # Remove piplite cell
-        if 'import piplite' in src or 'await piplite.install' in src:
-            skipped_piplite = True
-            continue
-
-        # Replace JS fetch loader
-        if 'from js import fetch' in src and 'spacex_df' in src:
-            cell.source = LOADER_CODE
-            replaced_loader = True
-            new_cells.append(cell)
-            continue
-
-        # Replace Initial the map cell
-        if 'site_map = folium.Map(location=nasa_coordinate, zoom_start=5)' in src and 'Initial the map' in src:
-            cell.source = SAFETY_MAP_CODE
-            replaced_map = True
-            new_cells.append(cell)
-            continue
-
-        # Some course notebooks split the loop from the map init. If we find the loop-only cell,
-        # neutralize it to just display the map to prevent NameErrors.
-        if '# For each launch site, add a Circle object based on its coordinate' in src and 'launch_sites_df.iterrows()' in src:
-            cell.source = (
-                "try:\n"
-                "    site_map\n"
-                "except NameError:\n"
-                "    print('Note: Run the initial map cell above to create site_map.')\n"
-            )
-            replaced_map_loop_only = True
-            new_cells.append(cell)
-            continue
-
-        # If a previous patch left a cell with only `site_map`, make it safe too
-        if src.strip() == 'site_map':
-            cell.source = (
-                "try:\n"
-                "    site_map\n"
-                "except NameError:\n"
-                "    print('Note: Run the initial map cell above to create site_map.')\n"
-            )
-            replaced_map_loop_only = True
-            new_cells.append(cell)
-            continue
-
-        # Marker color creation cell
-        if 'Apply a function to check the value of `class` column' in src or 'marker_color value' in src:
-            cell.source = MARKER_COLOR_CODE
-            replaced_marker_color = True
-            new_cells.append(cell)
-            continue
-
-        # Marker cluster loop cell
-        if 'site_map.add_child(marker_cluster)' in src and 'marker_cluster.add_child(marker)' in src:
-            # Only replace if there is a TODO inside
-            if 'TODO' in src or 'marker = folium.Marker(...' in src:
-                cell.source = MARKER_CLUSTER_CODE
-                replaced_cluster = True
-            new_cells.append(cell)
-            continue
-
-        # Coastline distance cell
-        if '# find coordinate of the closet coastline' in src:
-            cell.source = COASTLINE_DISTANCE_CODE
-            replaced_coast = True
-            new_cells.append(cell)
-            continue
-
-        # Coastline marker cell
-        if '# Create and add a folium.Marker on your selected closest coastline point on the map' in src:
-            cell.source = COASTLINE_MARKER_CODE
-            replaced_coast_marker = True
-            new_cells.append(cell)
-            continue
-
-        # Polyline cell
-        if 'folium.PolyLine' in src and 'site_map.add_child(lines)' in src:
-            cell.source = POLYLINE_CODE
-            replaced_polyline = True
-            new_cells.append(cell)
-            continue
-
-        new_cells.append(cell)
-
-    nb.cells = new_cells
-
-    nbf.write(nb, str(NB_PATH))
+    result = NotebookPatcher(RULES).patch(NB_PATH)
+    if not result.changed:
+        print('No changes made (already patched?):', NB_REL)
+        return
+
+    # One compressed blob per distinct version; an already stored version costs only its hash
+    digest, created = backup_notebook(NB_PATH, note='before patch_module03_notebook')
+    write_notebook(NB_PATH, result.nb)
 
     print('Patched notebook:', NB_REL)
-    print('Backup saved to:', backup_target)
+    print(f'Backup {digest[:12]}', 'saved' if created else 'already stored',
+          f'(restore: python tools/notebook_backup.py restore {NB_REL.as_posix()} {digest[:12]})')
     print('Changes:')
-    print('  removed piplite cell      :', skipped_piplite)
-    print('  replaced CSV loader       :', replaced_loader)
-    print('  replaced initial map cell :', replaced_map)
-    print('  added marker_color cell   :', replaced_marker_color)
-    print('  filled marker cluster     :', replaced_cluster)
-    print('  coastline distance calc   :', replaced_coast)
-    print('  coastline marker          :', replaced_coast_marker)
-    print('  polyline added            :', replaced_polyline)
-    print('  map loop-only neutralized :', replaced_map_loop_only)
+    for line in format_report([result])[1:]:
+        print(line)
 
 
 if __name__ == '__main__':
@@ -1,156 +1,361 @@
 from __future__ import annotations
 import os
-import requests
+from functools import lru_cache
+from typing import Optional
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from dash import Dash, dcc, html, Input, Output
-
-DATA_URL = (
-    "https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/"
-    "IBM-DS0321EN-SkillsNetwork/datasets/spacex_launch_dash.csv"
-)
-DATA_LOCAL = os.path.join(os.path.dirname(__file__), "spacex_launch_dash.csv")
-
-
-def load_spacex_dash(url: str = DATA_URL, local: str = DATA_LOCAL) -> pd.DataFrame:
-    """Load SpaceX Dash CSV with local cache.
-    Tries local file first; if missing, downloads from URL.
-    """
-    if os.path.exists(local):
-        return pd.read_csv(local)
-    # Download and save
-    try:
-        r = requests.get(url, timeout=30)
-        r.raise_for_status()
-        with open(local, "wb") as f:
-            f.write(r.content)
-    except Exception as e:
-        # Fall back to direct read from URL
-        try:
-            return pd.read_csv(url)
-        except Exception:
-            raise RuntimeError(f"Failed to load dataset from {url} or local cache: {e}")
-    return pd.read_csv(local)
-
-
-# Load data
-spacex_df = load_spacex_dash()
-min_payload = int(spacex_df["Payload Mass (kg)"].min())
-max_payload = int(spacex_df["Payload Mass (kg)"].max())
+import plotly.graph_objects as go
+import plotly.io as pio
+from dash import ClientsideFunction, Dash, Patch, dcc, html, Input, Output
+
+from dash_data import BOOSTER_COL, CLASS_COL, PAYLOAD_COL, SITE_COL, DashSnapshot, minmax_sample
+from dash_provider import CHECK_INTERVAL, DATA_LOCAL, DataProvider
+from figure_memo import FigureMemo
+
+# Launch table to serve; a .csv or columnar .parquet copy, reloaded when it changes
+DATA_PATH = os.environ.get("SPACEX_DASH_DATA", DATA_LOCAL)
+RELOAD_INTERVAL = float(os.environ.get("SPACEX_DASH_RELOAD_SECONDS", CHECK_INTERVAL))
+# Scatter traces switch to WebGL above this many points, and are thinned above the second
+WEBGL_POINTS = 1000
+MAX_SCATTER_POINTS = 20000
+# Memoized figures kept per process; 0 turns the memo off
+FIGURE_CACHE_SIZE = int(os.environ.get("SPACEX_DASH_CACHE_SIZE", 256))
+# Set to a shared directory when running several worker processes
+FIGURE_CACHE_DIR = os.environ.get("SPACEX_DASH_CACHE_DIR")
+# Ship the launch records to the browser once and filter there (assets/dashboard_clientside.js)
+CLIENTSIDE = os.environ.get("SPACEX_DASH_CLIENTSIDE") == "1"
+# Booster / year / outcome filters, answered from the snapshot's cube (server callbacks only)
+FILTERS = os.environ.get("SPACEX_DASH_FILTERS", "1") == "1" and not CLIENTSIDE
+OUTCOME_OPTIONS = [{"label": "Success", "value": 1}, {"label": "Failure", "value": 0}]
+
+
+# Data loads on first use, not at import; callbacks read the provider's current snapshot
+provider = DataProvider(DATA_PATH, check_interval=RELOAD_INTERVAL)
+# Serialized figures per (callback, data version, inputs)
+figure_memo = FigureMemo(FIGURE_CACHE_SIZE, FIGURE_CACHE_DIR)
+provider.on_change(lambda snap: figure_memo.clear(keep_version=snap.version))
+
+
+def reload_data(df: pd.DataFrame | None = None) -> DashSnapshot:
+    """Swap in a snapshot of `df`, or of the data file when no frame is given."""
+    if df is None:
+        df = provider.load()
+    return provider.replace(df)
+
 
 # Build Dash app
 app = Dash(__name__)
 app.title = "SpaceX Launch Records Dashboard"
 
-site_options = (
-    [{"label": "All Sites", "value": "ALL"}]
-    + [{"label": s, "value": s} for s in sorted(spacex_df["Launch Site"].unique())]
-)
 
-app.layout = html.Div([
-    html.H1(
-        "SpaceX Launch Records Dashboard",
-        style={"textAlign": "center", "color": "#503D36", "font-size": 40},
-    ),
+def client_payload(snap: DashSnapshot) -> dict:
+    """Columnar launch records plus what the clientside callbacks need to draw like px."""
+    df = snap.df
+    payload = df[PAYLOAD_COL].astype(float)
+    # A missing class goes out as null and is skipped in the browser, as launch_counts masks it
+    outcome = pd.to_numeric(df[CLASS_COL], errors="coerce").astype("Int64")
+    template = pio.templates[pio.templates.default]
+    return {
+        "sites": list(snap.sites),
+        "site": pd.Categorical(df[SITE_COL], categories=snap.sites).codes.tolist(),
+        # Same codes as the server's column_codes: -1 for a missing booster, never a "nan" label
+        "boosters": list(snap.boosters),
+        "booster": snap.booster_codes.tolist(),
+        "payload": payload.where(payload.notna(), None).tolist(),
+        "class": outcome.astype(object).where(outcome.notna(), None).tolist(),
+        "outcomes": {s: list(v) for s, v in snap.outcomes.items()},
+        "colorway": list(template.layout.colorway),
+        "webgl_points": WEBGL_POINTS,
+        "template": template.to_plotly_json(),
+    }
+
+
+SCATTER_TITLE = "Correlation between Payload and Success for {}"
+
+
+@lru_cache(maxsize=None)
+def pie_base() -> go.Figure:
+    """The px pie without data: template and legend. Callbacks patch traces and title in."""
+    # A title keeps px from reserving its untitled top margin
+    return px.pie(values=[], names=[], title="Total Success Launches by Site")
+
+
+@lru_cache(maxsize=None)
+def scatter_base() -> go.Figure:
+    """The px scatter without data: template, axes and legend."""
+    # Text dtype for the color column, or px would draw a continuous color axis
+    empty = pd.DataFrame({PAYLOAD_COL: [], CLASS_COL: [], BOOSTER_COL: [], SITE_COL: []}, dtype=object)
+    fig = px.scatter(empty, x=PAYLOAD_COL, y=CLASS_COL, color=BOOSTER_COL, hover_data=[SITE_COL],
+                     title=SCATTER_TITLE.format("All Sites"))
+    fig.update_yaxes(tickmode="array", tickvals=[0, 1], ticktext=["Failure", "Success"])
+    return fig
+
+
+def figure_patch(traces: list[dict], title: str, legend_title: str | None = None) -> Patch:
+    # Only the traces and titles change between inputs; layout and template stay in the browser
+    patch = Patch()
+    patch["data"] = traces
+    patch["layout"]["title"]["text"] = title
+    if legend_title:
+        patch["layout"]["legend"]["title"]["text"] = legend_title
+    else:
+        del patch["layout"]["legend"]["title"]
+    return patch
+
+
+@app.server.route("/cache-stats")
+def cache_stats():
+    return {**figure_memo.stats(), "data_version": provider.current().version}
+
+
+def slider_max(snap: DashSnapshot) -> int:
+    # The lab's 0-10000 kg scale, widened in 2500 kg steps if heavier payloads show up
+    return max(10000, -(-snap.payload_max // 2500) * 2500)
+
+
+def filter_controls(snap: DashSnapshot | None):
+    years = snap.years if snap else ()
+    return html.Div([
+        dcc.Dropdown(
+            id="booster-filter",
+            options=[{"label": b, "value": b} for b in (snap.boosters if snap else ())],
+            multi=True,
+            placeholder="All booster versions",
+            style={"flex": 2},
+        ),
+        dcc.Dropdown(
+            id="year-filter",
+            options=[{"label": str(y), "value": y} for y in years],
+            multi=True,
+            placeholder="All years" if years else "No launch dates in this table",
+            disabled=not years,
+            style={"flex": 1},
+        ),
+        dcc.Checklist(id="outcome-filter", options=OUTCOME_OPTIONS, value=[1, 0], inline=True),
+    ], style={"display": "flex", "gap": "12px", "alignItems": "center", "width": "80%", "margin": "10px auto"})
+
+
+def page_layout(snap: DashSnapshot | None):
+    # snap=None gives the same component tree without touching the data
+    site_options = (
+        [{"label": "All Sites", "value": "ALL"}]
+        + [{"label": s, "value": s} for s in (snap.sites if snap else ())]
+    )
+    top = slider_max(snap) if snap else 10000
+    return html.Div([
+        html.H1(
+            "SpaceX Launch Records Dashboard",
+            style={"textAlign": "center", "color": "#503D36", "font-size": 40},
+        ),
+
+        # TASK 1: Dropdown for launch site selection
+        dcc.Dropdown(
+            id="site-dropdown",
+            options=site_options,
+            value="ALL",
+            placeholder="Select a Launch Site here",
+            searchable=True,
+            clearable=False,
+            style={"width": "80%", "margin": "auto"},
+        ),
+
+        filter_controls(snap) if FILTERS else html.Br(),
+
+        # TASK 2: Pie chart
+        html.Div(dcc.Graph(id="success-pie-chart", figure=pie_base())),
+
+        html.Br(),
+
+        html.P("Payload range (Kg):"),
+
+        # TASK 3: Range slider for payload
+        dcc.RangeSlider(
+            id="payload-slider",
+            min=0, max=top, step=1000,
+            value=[snap.payload_min, snap.payload_max] if snap else [0, top],
+            marks={i: str(i) for i in range(0, top + 1, 2500)},
+        ),
+
+        html.P(id="filter-summary") if FILTERS else html.Br(),
 
-    # TASK 1: Dropdown for launch site selection
-    dcc.Dropdown(
-        id="site-dropdown",
-        options=site_options,
-        value="ALL",
-        placeholder="Select a Launch Site here",
-        searchable=True,
-        clearable=False,
-        style={"width": "80%", "margin": "auto"},
-    ),
+        # TASK 4: Scatter chart
+        html.Div(dcc.Graph(id="success-payload-scatter-chart", figure=scatter_base())),
 
-    html.Br(),
+        # Launch records for the clientside callbacks (empty in server mode)
+        dcc.Store(id="launch-data", data=client_payload(snap) if CLIENTSIDE and snap else None),
+    ], style={"padding": "0 25px"})
 
-    # TASK 2: Pie chart
-    html.Div(dcc.Graph(id="success-pie-chart")),
 
-    html.Br(),
+def serve_layout():
+    # Built per page load, so sites and slider bounds follow the current data
+    return page_layout(provider.current())
 
-    html.P("Payload range (Kg):"),
 
-    # TASK 3: Range slider for payload
-    dcc.RangeSlider(
-        id="payload-slider",
-        min=0, max=10000, step=1000,
-        value=[min_payload, max_payload],
-        marks={i: str(i) for i in range(0, 10001, 2500)},
-    ),
+# Dash validates callback ids against this instead of calling serve_layout at import
+app.validation_layout = page_layout(None)
+app.layout = serve_layout
 
-    html.Br(),
 
-    # TASK 4: Scatter chart
-    html.Div(dcc.Graph(id="success-payload-scatter-chart")),
-], style={"padding": "0 25px"})
+Filters = tuple[Optional[tuple[int, ...]], Optional[tuple[int, ...]], Optional[tuple[int, ...]]]
+NO_FILTERS: Filters = (None, None, None)
+
+
+def filter_codes(snap: DashSnapshot, boosters: list[str] | None, outcomes: list[int] | None,
+                 years: list[int] | None) -> Filters:
+    """Widget values as (booster codes, classes, year codes); None where nothing is filtered out."""
+    # An empty dropdown means "all"; values the current data no longer has are dropped
+    booster_sel = tuple(sorted({snap.boosters.index(b) for b in boosters if b in snap.boosters})) if boosters else None
+    year_sel = tuple(sorted({snap.years.index(y) for y in years if y in snap.years})) if years else None
+    # Picking every option filters nothing out, so it also keeps launches missing that field
+    if booster_sel is not None and len(booster_sel) == len(snap.boosters):
+        booster_sel = None
+    if year_sel is not None and len(year_sel) == len(snap.years):
+        year_sel = None
+    outcome_sel = None if outcomes is None or set(outcomes) >= {0, 1} else tuple(sorted(outcomes))
+    return booster_sel, outcome_sel, year_sel
 
 
 # Callback for pie chart
-@app.callback(
-    Output("success-pie-chart", "figure"),
-    Input("site-dropdown", "value")
-)
-def update_pie(selected_site: str):
+def update_pie(selected_site: str, boosters: list[str] | None = None, outcomes: list[int] | None = None,
+               years: list[int] | None = None):
+    snap = provider.current()
+    filters = filter_codes(snap, boosters, outcomes, years)
+    return figure_memo.get_or_build(("pie", snap.version, selected_site, filters),
+                                    lambda: pie_patch(snap, selected_site, filters))
+
+
+def pie_patch(snap: DashSnapshot, selected_site: str, filters: Filters = NO_FILTERS) -> Patch:
+    # Trace fields as px.pie writes them
+    trace = {"type": "pie", "domain": {"x": [0.0, 1.0], "y": [0.0, 1.0]},
+             "name": "", "legendgroup": "", "showlegend": True}
+    # Per-site counts; with filters they are summed from the cube
+    counts = snap.filtered_outcomes(*filters)
     if selected_site == "ALL":
         # Success count per site (class == 1)
-        success_counts = (
-            spacex_df.groupby("Launch Site")["class"].sum().reset_index(name="successes")
-        )
-        fig = px.pie(
-            success_counts,
-            values="successes",
-            names="Launch Site",
-            title="Total Success Launches by Site",
-        )
-        return fig
+        trace.update(labels=list(snap.sites), values=[counts[s][0] for s in snap.sites],
+                     hovertemplate="label=%{label}<br>value=%{value}<extra></extra>")
+        return figure_patch([trace], "Total Success Launches by Site")
     # Specific site: success vs failure counts
-    dff = spacex_df[spacex_df["Launch Site"] == selected_site]
-    outcome_counts = (
-        dff["class"].value_counts().rename_axis("Outcome").reset_index(name="count")
-    )
-    outcome_counts["Outcome"] = outcome_counts["Outcome"].map({1: "Success", 0: "Failure"})
-    fig = px.pie(
-        outcome_counts,
-        values="count",
-        names="Outcome",
-        title=f"Total Launch Outcomes for {selected_site}",
-        color="Outcome",
-        color_discrete_map={"Success": "green", "Failure": "red"},
-    )
-    return fig
+    successes, failures = counts.get(selected_site, (0, 0))
+    outcomes = [(o, n, c) for o, n, c in [("Success", successes, "green"), ("Failure", failures, "red")] if n > 0]
+    trace.update(labels=[o for o, _, _ in outcomes], values=[n for _, n, _ in outcomes],
+                 customdata=[[o] for o, _, _ in outcomes], marker={"colors": [c for _, _, c in outcomes]},
+                 hovertemplate="Outcome=%{customdata[0]}<br>count=%{value}<extra></extra>")
+    return figure_patch([trace], f"Total Launch Outcomes for {selected_site}")
 
 
 # Callback for scatter chart
-@app.callback(
-    Output("success-payload-scatter-chart", "figure"),
-    [Input("site-dropdown", "value"), Input("payload-slider", "value")],
-)
-def update_scatter(selected_site: str, payload_range: list[int]):
+def update_scatter(selected_site: str, payload_range: list[int], boosters: list[str] | None = None,
+                   outcomes: list[int] | None = None, years: list[int] | None = None):
     low, high = payload_range
-    mask = (spacex_df["Payload Mass (kg)"] >= low) & (spacex_df["Payload Mass (kg)"] <= high)
-    dff = spacex_df[mask]
-    if selected_site != "ALL":
-        dff = dff[dff["Launch Site"] == selected_site]
-
-    fig = px.scatter(
-        dff,
-        x="Payload Mass (kg)",
-        y="class",
-        color="Booster Version Category",
-        title=(
-            "Correlation between Payload and Success for All Sites"
-            if selected_site == "ALL"
-            else f"Correlation between Payload and Success for {selected_site}"
-        ),
-        hover_data=["Launch Site"],
+    snap = provider.current()
+    filters = filter_codes(snap, boosters, outcomes, years)
+    return figure_memo.get_or_build(("scatter", snap.version, selected_site, low, high, filters),
+                                    lambda: scatter_patch(snap, selected_site, low, high, filters))
+
+
+def scatter_patch(snap: DashSnapshot, selected_site: str, low: float, high: float,
+                  filters: Filters = NO_FILTERS) -> Patch:
+    # Binary search on the site's payload-sorted index instead of masking every row
+    rows = snap.payload_positions(selected_site, low, high)
+    # Rows without a booster category have no trace to go in
+    rows = rows[snap.booster_codes[rows] >= 0]
+    if filters != NO_FILTERS:
+        # The other filters only look at the rows already in the payload range
+        rows = rows[snap.row_mask(rows, *filters)]
+    title = SCATTER_TITLE.format("All Sites" if selected_site == "ALL" else selected_site)
+    colorway = scatter_base().layout.template.layout.colorway
+
+    payload = snap.df[PAYLOAD_COL].to_numpy()[rows]
+    outcome = snap.df[CLASS_COL].to_numpy()[rows]
+    booster = snap.booster_codes[rows]
+    total = len(rows)
+    # One trace per booster category, in order of first appearance (as px does)
+    codes, first = np.unique(booster, return_index=True)
+    by_booster = np.argsort(booster, kind="stable")
+    bounds = np.r_[np.searchsorted(booster[by_booster], codes), total]
+    site_labels = np.array(snap.site_names, dtype=object)
+    traces, shown = [], 0
+    for k in np.argsort(first):
+        picked = by_booster[bounds[k]:bounds[k + 1]]
+        if total > MAX_SCATTER_POINTS:
+            picked = downsample(picked, payload, outcome, MAX_SCATTER_POINTS / total)
+        name = snap.boosters[codes[k]]
+        traces.append({
+            # Past a few thousand markers SVG gets slow in the browser; WebGL does not
+            "type": "scattergl" if total > WEBGL_POINTS else "scatter",
+            "mode": "markers", "name": name, "legendgroup": name,
+            "showlegend": True, "orientation": "v", "xaxis": "x", "yaxis": "y",
+            "marker": {"color": colorway[len(traces) % len(colorway)], "symbol": "circle"},
+            "hovertemplate": f"{BOOSTER_COL}={name}<br>{PAYLOAD_COL}=%{{x}}<br>{CLASS_COL}=%{{y}}"
+                             f"<br>{SITE_COL}=%{{customdata[0]}}<extra></extra>",
+            "x": payload[picked], "y": outcome[picked],
+            "customdata": site_labels[snap.site_codes[rows[picked]]][:, None],
+        })
+        shown += len(picked)
+    if shown < total:
+        title = f"{title} ({shown:,} of {total:,} launches shown)"
+    # px titles the legend only when there is a trace
+    return figure_patch(traces, title, BOOSTER_COL if traces else None)
+
+
+def downsample(picked: np.ndarray, payload: np.ndarray, outcome: np.ndarray, share: float) -> np.ndarray:
+    # Each (booster, class) stratum keeps its share of the budget, thinned by payload min/max bins,
+    # so no category or outcome drops out of the plot
+    kept = []
+    for value in np.unique(outcome[picked]):
+        stratum = picked[outcome[picked] == value]
+        budget = max(2, int(len(stratum) * share))
+        kept.append(stratum[minmax_sample(payload[stratum], budget)])
+    return np.sort(np.concatenate(kept))
+
+
+# Callback for the filter summary line
+def update_summary(selected_site: str, payload_range: list[int], boosters: list[str] | None = None,
+                   outcomes: list[int] | None = None, years: list[int] | None = None) -> str:
+    low, high = payload_range
+    snap = provider.current()
+    successes, failures = snap.launch_counts(selected_site, low, high, *filter_codes(snap, boosters, outcomes, years))
+    launches = successes + failures
+    if not launches:
+        return "No launches match the filters."
+    return f"{launches:,} launches match the filters; {successes:,} succeeded ({successes / launches:.0%})."
+
+
+if CLIENTSIDE:
+    # Same inputs and figures, computed in the browser from the launch-data store
+    app.clientside_callback(
+        ClientsideFunction(namespace="spacex", function_name="pie"),
+        Output("success-pie-chart", "figure"),
+        Input("site-dropdown", "value"), Input("launch-data", "data"),
     )
-    fig.update_yaxes(tickmode="array", tickvals=[0, 1], ticktext=["Failure", "Success"])
-    return fig
+    app.clientside_callback(
+        ClientsideFunction(namespace="spacex", function_name="scatter"),
+        Output("success-payload-scatter-chart", "figure"),
+        Input("site-dropdown", "value"), Input("payload-slider", "value"), Input("launch-data", "data"),
+    )
+else:
+    filter_inputs = (
+        [Input("booster-filter", "value"), Input("outcome-filter", "value"), Input("year-filter", "value")]
+        if FILTERS else []
+    )
+    app.callback(
+        Output("success-pie-chart", "figure"),
+        [Input("site-dropdown", "value")] + filter_inputs,
+    )(update_pie)
+    app.callback(
+        Output("success-payload-scatter-chart", "figure"),
+        [Input("site-dropdown", "value"), Input("payload-slider", "value")] + filter_inputs,
+    )(update_scatter)
+    if FILTERS:
+        app.callback(
+            Output("filter-summary", "children"),
+            [Input("site-dropdown", "value"), Input("payload-slider", "value")] + filter_inputs,
+        )(update_summary)
 
 
 if __name__ == "__main__":
+    # Dev server only; production runs wsgi.py under gunicorn (gunicorn.conf.py)
     # Running with debug True is useful during development
     app.run(debug=True, host="127.0.0.1", port=8050)
@@ -0,0 +1,34 @@
+"""WSGI entry point for serving the dashboard with several worker processes.
+
+Run from module.03:
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Unless SPACEX_DASH_DATA points elsewhere, the launch CSV is exported once to
+memory-mappable columns (dash_columns), and refreshed when the CSV is newer
+than the export. All workers then map the same read-only files instead of
+each parsing the CSV. To publish new data while the server runs, re-export
+it; every worker swaps it in at its next check:
+    python dash_columns.py spacex_launch_dash.csv
+Figures are memoized in a directory shared by the workers
+(SPACEX_DASH_CACHE_DIR). `python spacex_dash_app.py` stays the dev server.
+"""
+import os
+import tempfile
+
+from dash_columns import export_columns, manifest_path_for
+from dash_provider import DATA_LOCAL, load_spacex_dash
+
+if "SPACEX_DASH_DATA" not in os.environ:
+    manifest = manifest_path_for(DATA_LOCAL)
+    if not os.path.exists(manifest) or (
+        os.path.exists(DATA_LOCAL) and os.path.getmtime(DATA_LOCAL) > os.path.getmtime(manifest)
+    ):
+        export_columns(load_spacex_dash(), manifest)
+    os.environ["SPACEX_DASH_DATA"] = manifest
+os.environ.setdefault("SPACEX_DASH_CACHE_DIR", os.path.join(tempfile.gettempdir(), "spacex_dash_figures"))
+
+from spacex_dash_app import app, provider  # noqa: E402
+
+# With preload_app the master maps the data before forking, so workers start with it
+provider.current()
+server = app.server
@@ -0,0 +1,134 @@
+"""Benchmark the SPACEXTABLE task suite with and without the task indexes.
+
+Runs every task in spacex_sql_tasks.TASKS against the real table (copied into
+memory so my_data1.db is not modified) and against a synthetic table of
+--rows rows whose categorical values are sampled from the real one. For each
+table and phase (no indexes, then indexed) it prints the query plan and the
+median / best latency per task.
+
+Usage:
+    python module.05/rev.02/bench_sql_tasks.py --rows 10000000
+"""
+from __future__ import annotations
+import os
+import sys
+import sqlite3
+import argparse
+import statistics
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from spacex_sql_tasks import DB_PATH, TABLE, TASKS, create_indexes, explain_task, time_task
+
+CHUNK_ROWS = 200_000
+DATE_START = np.datetime64('2010-06-04')
+DATE_END = np.datetime64('2024-12-31')
+
+
+def copy_to_memory(path: str) -> sqlite3.Connection:
+    src = sqlite3.connect(path)
+    mem = sqlite3.connect(':memory:')
+    try:
+        src.backup(mem)
+    finally:
+        src.close()
+    # Start from the bare table so the first phase measures full scans
+    names = [r[0] for r in mem.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (TABLE,))]
+    with mem:
+        for name in names:
+            mem.execute(f'DROP INDEX IF EXISTS "{name}"')
+    return mem
+
+
+def _value_pool(con: sqlite3.Connection, column: str) -> tuple[list, np.ndarray]:
+    rows = con.execute(f'SELECT "{column}", COUNT(*) FROM {TABLE} GROUP BY "{column}"').fetchall()
+    values = [r[0] for r in rows]
+    weights = np.array([r[1] for r in rows], dtype=float)
+    return values, weights / weights.sum()
+
+
+def build_synthetic(real: sqlite3.Connection, rows: int, path: str, seed: int = 0) -> sqlite3.Connection:
+    """Create a SPACEXTABLE of `rows` rows at `path`, shaped like the real one."""
+    schema = real.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLE,)).fetchone()[0]
+    columns = [r[1] for r in real.execute(f'PRAGMA table_info({TABLE})')]
+    pools = {c: _value_pool(real, c) for c in columns if c not in ('Date', 'PAYLOAD_MASS__KG_')}
+
+    rng = np.random.default_rng(seed)
+    span = int((DATE_END - DATE_START).astype(int))
+    con = sqlite3.connect(path)
+    con.execute('PRAGMA journal_mode = OFF')
+    con.execute('PRAGMA synchronous = OFF')
+    con.execute(f'DROP TABLE IF EXISTS {TABLE}')
+    con.execute(schema)
+    placeholders = ', '.join('?' for _ in columns)
+    insert = f'INSERT INTO {TABLE} VALUES ({placeholders})'
+    with con:
+        done = 0
+        while done < rows:
+            n = min(CHUNK_ROWS, rows - done)
+            data: dict[str, list] = {}
+            for c in columns:
+                if c == 'Date':
+                    days = rng.integers(0, span + 1, size=n)
+                    data[c] = (DATE_START + days).astype(str).tolist()
+                elif c == 'PAYLOAD_MASS__KG_':
+                    data[c] = rng.integers(0, 16000, size=n).tolist()
+                else:
+                    values, probs = pools[c]
+                    idx = rng.choice(len(values), size=n, p=probs)
+                    data[c] = [values[i] for i in idx]
+            con.executemany(insert, zip(*(data[c] for c in columns)))
+            done += n
+    return con
+
+
+def report(label: str, con: sqlite3.Connection, repeat: int) -> None:
+    print(f'=== {label}')
+    for name in TASKS:
+        timings = time_task(con, name, repeat=repeat)
+        median_ms = statistics.median(timings) * 1000
+        best_ms = min(timings) * 1000
+        print(f'{name:32s} median {median_ms:10.3f} ms   best {best_ms:10.3f} ms')
+        for step in explain_task(con, name):
+            print(f'    plan: {step}')
+    print()
+
+
+def bench(label: str, con: sqlite3.Connection, repeat: int) -> None:
+    n = con.execute(f'SELECT COUNT(*) FROM {TABLE}').fetchone()[0]
+    report(f'{label} ({n} rows), no indexes', con, repeat)
+    create_indexes(con)
+    report(f'{label} ({n} rows), indexed', con, repeat)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH, help='SQLite file holding the real SPACEXTABLE')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='synthetic table size (0 to skip)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per task')
+    parser.add_argument('--synthetic-db', default=None, help='where to build the synthetic table (default: temp file)')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f'Database not found: {args.db}')
+        sys.exit(1)
+
+    real = copy_to_memory(args.db)
+    try:
+        if args.rows > 0:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = args.synthetic_db or os.path.join(tmp, 'spacex_synthetic.db')
+                synth = build_synthetic(real, args.rows, path)
+                try:
+                    bench('synthetic', synth, args.repeat)
+                finally:
+                    synth.close()
+        bench('real', real, args.repeat)
+    finally:
+        real.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -94,27 +94,14 @@ get_ipython().run_line_magic('sql', 'sqlite:///my_data1.db')
 # In[7]:
 
 
-import pandas as pd
-df = pd.read_csv("https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/IBM-DS0321EN-SkillsNetwork/labs/module_2/data/Spacex.csv")
-df.to_sql("SPACEXTBL", con, if_exists='replace', index=False,method="multi")
+from spacex_sql_tasks import SPACEX_CSV_URL, load_spacex_csv
 
+# Stream Spacex.csv in chunks straight into a typed, indexed SPACEXTABLE
+load_spacex_csv(con, SPACEX_CSV_URL)
 
-# **Note:This below code is added to remove blank rows from table**
-# 
-
-# In[8]:
-
-
-#DROP THE TABLE IF EXISTS
-
-get_ipython().run_line_magic('sql', 'DROP TABLE IF EXISTS SPACEXTABLE;')
-
-
-# In[9]:
-
-
-get_ipython().run_line_magic('sql', 'create table SPACEXTABLE as select * from SPACEXTBL where Date is not null')
 
+# **Note: The loader above skips rows with a blank Date while streaming, so the table no longer needs to be copied to remove blank rows**
+# 
 
 # ## Tasks
 # 
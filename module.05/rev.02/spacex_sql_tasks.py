@@ -0,0 +1,224 @@
+"""SPACEXTABLE assignment queries (Tasks 1-10) as plain Python.
+
+The SQL is the same as in jupyter-labs-eda-sql-coursera_sqllite.py, without the
+%sql magics. INDEXES are chosen for these queries:
+  - Launch_Site COLLATE NOCASE lets SQLite turn the LIKE 'CCA%' prefix
+    match (case-insensitive by default) into an index range scan.
+  - (Landing_Outcome, PAYLOAD_MASS__KG_, Booster_Version) covers the drone-ship
+    payload filter; (Landing_Outcome, Date) gives MIN(Date) for ground-pad
+    landings and the 2015 drone-ship failures without touching the table.
+  - Customer, Booster_Version, Mission_Outcome, payload and Date indexes cover
+    the remaining aggregates and the Task 10 date range.
+
+load_spacex_csv streams Spacex.csv into a typed SPACEXTABLE under one savepoint,
+dropping blank-Date rows on the way in, so no SPACEXTBL staging copy is needed.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import time
+import urllib.request
+from typing import IO, Optional, Union
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(HERE, '..', '..'))
+DB_PATH = os.path.join(REPO_ROOT, 'module.02', 'my_data1.db')
+TABLE = 'SPACEXTABLE'
+SPACEX_CSV_URL = (
+    'https://cf-courses-data.s3.us.cloud-object-storage.appdomain.cloud/'
+    'IBM-DS0321EN-SkillsNetwork/labs/module_2/data/Spacex.csv'
+)
+CHUNK_ROWS = 50_000
+
+# Column name -> declared SQLite type, in Spacex.csv order
+COLUMNS: dict[str, str] = {
+    'Date': 'TEXT NOT NULL',
+    'Time (UTC)': 'TEXT',
+    'Booster_Version': 'TEXT',
+    'Launch_Site': 'TEXT',
+    'Payload': 'TEXT',
+    'PAYLOAD_MASS__KG_': 'INTEGER',
+    'Orbit': 'TEXT',
+    'Customer': 'TEXT',
+    'Mission_Outcome': 'TEXT',
+    'Landing_Outcome': 'TEXT',
+}
+SCHEMA = 'CREATE TABLE SPACEXTABLE (\n' + ',\n'.join(f'  "{c}" {t}' for c, t in COLUMNS.items()) + '\n)'
+
+TASKS: dict[str, str] = {
+    'task1_unique_sites':
+        'SELECT DISTINCT "Launch_Site" FROM SPACEXTABLE;',
+    'task2_cca_sites':
+        'SELECT * FROM SPACEXTABLE WHERE "Launch_Site" LIKE \'CCA%\' LIMIT 5;',
+    'task3_nasa_crs_payload':
+        'SELECT SUM("PAYLOAD_MASS__KG_") AS "Total Payload Mass for NASA (CRS)" '
+        'FROM SPACEXTABLE WHERE "Customer" = \'NASA (CRS)\';',
+    'task4_f9_v11_avg_payload':
+        'SELECT AVG("PAYLOAD_MASS__KG_") AS "Average Payload Mass for F9 v1.1" '
+        'FROM SPACEXTABLE WHERE "Booster_Version" = \'F9 v1.1\';',
+    'task5_first_ground_pad':
+        'SELECT MIN("Date") AS "First Successful Ground Pad Landing" '
+        'FROM SPACEXTABLE WHERE "Landing_Outcome" = \'Success (ground pad)\';',
+    'task6_drone_ship_boosters':
+        'SELECT "Booster_Version" FROM SPACEXTABLE WHERE "Landing_Outcome" = \'Success (drone ship)\' '
+        'AND "PAYLOAD_MASS__KG_" > 4000 AND "PAYLOAD_MASS__KG_" < 6000;',
+    'task7_mission_outcomes':
+        'SELECT "Mission_Outcome", COUNT(*) AS "Total" FROM SPACEXTABLE GROUP BY "Mission_Outcome";',
+    'task8_max_payload_boosters':
+        'SELECT DISTINCT "Booster_Version" FROM SPACEXTABLE '
+        'WHERE "PAYLOAD_MASS__KG_" = (SELECT MAX("PAYLOAD_MASS__KG_") FROM SPACEXTABLE);',
+    'task9_2015_drone_ship_failures':
+        'SELECT substr("Date", 6, 2) as Month, "Landing_Outcome", "Booster_Version", "Launch_Site" '
+        'FROM SPACEXTABLE WHERE substr("Date", 0, 5) = \'2015\' AND "Landing_Outcome" = \'Failure (drone ship)\';',
+    'task10_landing_outcome_rank':
+        'SELECT "Landing_Outcome", COUNT(*) AS "Count" FROM SPACEXTABLE '
+        'WHERE "Date" BETWEEN \'2010-06-04\' AND \'2017-03-20\' '
+        'GROUP BY "Landing_Outcome" ORDER BY "Count" DESC;',
+}
+
+INDEXES: dict[str, str] = {
+    'idx_spacex_site':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_site ON SPACEXTABLE ("Launch_Site")',
+    'idx_spacex_site_nocase':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_site_nocase ON SPACEXTABLE ("Launch_Site" COLLATE NOCASE)',
+    'idx_spacex_customer_payload':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_customer_payload ON SPACEXTABLE ("Customer", "PAYLOAD_MASS__KG_")',
+    'idx_spacex_booster_payload':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_booster_payload ON SPACEXTABLE ("Booster_Version", "PAYLOAD_MASS__KG_")',
+    'idx_spacex_landing_payload':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_landing_payload '
+        'ON SPACEXTABLE ("Landing_Outcome", "PAYLOAD_MASS__KG_", "Booster_Version")',
+    'idx_spacex_landing_date':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_landing_date ON SPACEXTABLE ("Landing_Outcome", "Date")',
+    'idx_spacex_mission':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_mission ON SPACEXTABLE ("Mission_Outcome")',
+    'idx_spacex_payload':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_payload ON SPACEXTABLE ("PAYLOAD_MASS__KG_", "Booster_Version")',
+    'idx_spacex_date':
+        'CREATE INDEX IF NOT EXISTS idx_spacex_date ON SPACEXTABLE ("Date", "Landing_Outcome")',
+}
+
+
+def create_indexes(con: sqlite3.Connection, analyze: bool = True) -> None:
+    with con:
+        for sql in INDEXES.values():
+            con.execute(sql)
+        if analyze:
+            con.execute('ANALYZE')
+
+
+def drop_indexes(con: sqlite3.Connection) -> None:
+    with con:
+        for name in INDEXES:
+            con.execute(f'DROP INDEX IF EXISTS {name}')
+        # Forget stale planner statistics along with the indexes
+        has_stat = con.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        if has_stat:
+            con.execute('DELETE FROM sqlite_stat1')
+
+
+def _open_csv(source: Union[str, IO[bytes]]) -> IO[bytes]:
+    # pandas buffers a whole URL before parsing; urlopen hands it a stream instead
+    if isinstance(source, str) and source.startswith(('http://', 'https://')):
+        return urllib.request.urlopen(source, timeout=30)
+    if isinstance(source, str):
+        return open(source, 'rb')
+    return source
+
+
+def _clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = chunk[chunk['Date'].notna()]
+    missing = [c for c in COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f'Spacex CSV is missing columns: {missing}')
+    chunk = chunk[list(COLUMNS)].copy()
+    chunk['PAYLOAD_MASS__KG_'] = pd.to_numeric(chunk['PAYLOAD_MASS__KG_'], errors='coerce').round().astype('Int64')
+    # sqlite3 binds None, not NaN / pd.NA
+    return chunk.astype(object).where(chunk.notna(), None)
+
+
+def load_spacex_csv(con: sqlite3.Connection, source: Union[str, IO[bytes]] = SPACEX_CSV_URL,
+                    chunksize: int = CHUNK_ROWS, indexes: bool = True) -> int:
+    """Replace SPACEXTABLE with the rows of Spacex.csv that have a Date.
+
+    The CSV is parsed `chunksize` rows at a time and each chunk goes straight
+    to executemany, so peak memory is about one chunk. Table, rows and indexes
+    are written under one SAVEPOINT. On a connection with no open transaction
+    they are committed when the load finishes. If the caller already has a
+    transaction open (sqlite3 opens one implicitly after any DML), the load
+    joins it and is committed together with it. A failed load is rolled back
+    to the savepoint, leaving the caller's earlier changes in place. Returns
+    the number of rows loaded.
+    """
+    insert = f'INSERT INTO {TABLE} VALUES ({", ".join("?" for _ in COLUMNS)})'
+    loaded = 0
+    handle = _open_csv(source)
+    try:
+        # BEGIN would fail inside the caller's transaction; a savepoint nests
+        con.execute('SAVEPOINT load_spacex_csv')
+        try:
+            con.execute(f'DROP TABLE IF EXISTS {TABLE}')
+            con.execute(SCHEMA)
+            for chunk in pd.read_csv(handle, chunksize=chunksize, dtype={'Date': str, 'Time (UTC)': str}):
+                chunk = _clean_chunk(chunk)
+                con.executemany(insert, chunk.itertuples(index=False, name=None))
+                loaded += len(chunk)
+            if indexes:
+                # Building indexes after the bulk insert is cheaper than maintaining them row by row
+                for sql in INDEXES.values():
+                    con.execute(sql)
+                con.execute('ANALYZE')
+            con.execute('RELEASE load_spacex_csv')
+        except BaseException:
+            con.execute('ROLLBACK TO load_spacex_csv')
+            con.execute('RELEASE load_spacex_csv')
+            raise
+    finally:
+        if handle is not source:
+            handle.close()
+    return loaded
+
+
+def run_task(con: sqlite3.Connection, name: str) -> pd.DataFrame:
+    return pd.read_sql_query(TASKS[name], con)
+
+
+def run_all(con: sqlite3.Connection) -> dict[str, pd.DataFrame]:
+    return {name: run_task(con, name) for name in TASKS}
+
+
+def explain_task(con: sqlite3.Connection, name: str) -> list[str]:
+    rows = con.execute('EXPLAIN QUERY PLAN ' + TASKS[name]).fetchall()
+    return [row[-1] for row in rows]
+
+
+def time_task(con: sqlite3.Connection, name: str, repeat: int = 5) -> list[float]:
+    """Wall-clock seconds per run, fetching every row but skipping pandas."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        con.execute(TASKS[name]).fetchall()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    return sqlite3.connect(path or DB_PATH)
+
+
+def main():
+    con = connect()
+    try:
+        create_indexes(con)
+        for name, df in run_all(con).items():
+            print(f'## {name}')
+            print(df.to_string(index=False))
+            print()
+    finally:
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""Content-addressed, deduplicated notebook backups.
+
+Each distinct version of a notebook is stored once, gzip-compressed, under
+the SHA-256 of its bytes in a `.notebook_backups/` directory next to the
+notebook. index.json records, per notebook, the versions in the order they
+were saved. Backing up a version that is already stored costs one hash and
+writes nothing.
+
+Usage:
+    python tools/notebook_backup.py backup  module.03/lab_jupyter_launch_site_location.ipynb
+    python tools/notebook_backup.py list    module.03/lab_jupyter_launch_site_location.ipynb
+    python tools/notebook_backup.py restore module.03/lab_jupyter_launch_site_location.ipynb 3fa1c2
+    python tools/notebook_backup.py ingest  NOTEBOOK OLD_COPY.ipynb ... [--delete]
+"""
+from __future__ import annotations
+import os
+import re
+import gzip
+import json
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+STORE_NAME = '.notebook_backups'
+INDEX_NAME = 'index.json'
+
+
+def default_store(notebook: Path) -> Path:
+    return Path(notebook).resolve().parent / STORE_NAME
+
+
+def _blob_path(store: Path, digest: str) -> Path:
+    return store / f'{digest}.ipynb.gz'
+
+
+def load_index(store: Path) -> dict[str, list[dict]]:
+    path = store / INDEX_NAME
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600; give the file the usual umask-based mode
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def save_index(store: Path, index: dict[str, list[dict]]) -> None:
+    _atomic_write(store / INDEX_NAME, (json.dumps(index, indent=1, sort_keys=True) + '\n').encode('utf-8'))
+
+
+def store_bytes(notebook: Path, data: bytes, store: Optional[Path] = None, note: str = '',
+                saved: Optional[str] = None) -> tuple[str, bool]:
+    """Record `data` as a version of `notebook`; returns (digest, whether a new blob was written)."""
+    store = Path(store) if store else default_store(notebook)
+    digest = hashlib.sha256(data).hexdigest()
+    blob = _blob_path(store, digest)
+    created = not blob.exists()
+    if created:
+        store.mkdir(parents=True, exist_ok=True)
+        # mtime=0 keeps the blob bytes a pure function of the content
+        _atomic_write(blob, gzip.compress(data, compresslevel=9, mtime=0))
+
+    index = load_index(store)
+    versions = index.setdefault(Path(notebook).name, [])
+    if not any(v['hash'] == digest for v in versions):
+        versions.append({
+            'hash': digest,
+            'saved': saved or datetime.now().isoformat(timespec='seconds'),
+            'bytes': len(data),
+            'note': note,
+        })
+        save_index(store, index)
+    return digest, created
+
+
+def backup_notebook(notebook: Path, store: Optional[Path] = None, note: str = '') -> tuple[str, bool]:
+    with open(notebook, 'rb') as f:
+        return store_bytes(notebook, f.read(), store, note)
+
+
+def list_backups(notebook: Path, store: Optional[Path] = None) -> list[dict]:
+    store = Path(store) if store else default_store(notebook)
+    return load_index(store).get(Path(notebook).name, [])
+
+
+def find_version(notebook: Path, prefix: str, store: Optional[Path] = None) -> dict:
+    matches = [v for v in list_backups(notebook, store) if v['hash'].startswith(prefix)]
+    if not matches:
+        raise KeyError(f'No backup of {Path(notebook).name} matches {prefix!r}')
+    if len(matches) > 1:
+        raise KeyError(f'{prefix!r} is ambiguous: {", ".join(v["hash"][:12] for v in matches)}')
+    return matches[0]
+
+
+def read_version(notebook: Path, digest: str, store: Optional[Path] = None) -> bytes:
+    store = Path(store) if store else default_store(notebook)
+    data = gzip.decompress(_blob_path(store, digest).read_bytes())
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f'Backup blob {digest[:12]} is corrupt')
+    return data
+
+
+def restore_notebook(notebook: Path, prefix: str, store: Optional[Path] = None,
+                     target: Optional[Path] = None) -> Path:
+    """Write the version matching `prefix` to `target` (default: over the notebook)."""
+    version = find_version(notebook, prefix, store)
+    data = read_version(notebook, version['hash'], store)
+    target = Path(target) if target else Path(notebook)
+    if target.resolve() == Path(notebook).resolve() and target.exists():
+        # Keep the version being replaced, so a restore can itself be undone
+        backup_notebook(notebook, store, note=f'before restoring {version["hash"][:12]}')
+    _atomic_write(target, data)
+    return target
+
+
+def _copy_timestamp(copy: Path) -> str:
+    # Old copies are named <notebook>.backup.YYYYmmdd-HHMMSS.ipynb; fall back to the file time
+    m = re.search(r'\.backup\.(\d{8}-\d{6})\.', copy.name)
+    when = datetime.strptime(m.group(1), '%Y%m%d-%H%M%S') if m else datetime.fromtimestamp(copy.stat().st_mtime)
+    return when.isoformat(timespec='seconds')
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default=None, help=f'backup directory (default: {STORE_NAME}/ next to the notebook)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('backup', help='store the current version')
+    p.add_argument('notebook')
+    p.add_argument('--note', default='')
+    p = sub.add_parser('list', help='list stored versions, oldest first')
+    p.add_argument('notebook')
+    p = sub.add_parser('restore', help='bring back a stored version')
+    p.add_argument('notebook')
+    p.add_argument('hash', help='version hash or a unique prefix of it')
+    p.add_argument('--to', default=None, help='write here instead of over the notebook')
+    p = sub.add_parser('ingest', help='store old full-copy backups as versions of the notebook')
+    p.add_argument('notebook')
+    p.add_argument('copies', nargs='+')
+    p.add_argument('--delete', action='store_true', help='remove each copy once it is stored')
+    args = parser.parse_args(argv)
+
+    notebook = Path(args.notebook)
+    store = Path(args.store) if args.store else None
+    if args.command == 'backup':
+        digest, created = backup_notebook(notebook, store, args.note)
+        print(f'{digest[:12]} {"stored" if created else "already stored"}')
+    elif args.command == 'list':
+        for v in list_backups(notebook, store):
+            print(f'{v["hash"][:12]}  {v["saved"]}  {v["bytes"]:9d} B  {v["note"]}')
+    elif args.command == 'restore':
+        target = restore_notebook(notebook, args.hash, store, args.to)
+        print(f'Restored {args.hash} to {target}')
+    elif args.command == 'ingest':
+        for copy in map(Path, args.copies):
+            digest, created = store_bytes(notebook, copy.read_bytes(), store, note=f'from {copy.name}',
+                                          saved=_copy_timestamp(copy))
+            print(f'{copy}: {digest[:12]} {"stored" if created else "duplicate"}')
+            if args.delete:
+                copy.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Move notebook cell outputs into a content-addressed side store and back.
+
+compact replaces the outputs of every code cell whose outputs serialize to
+at least --min-bytes with an empty list, and records their hashes under
+cell metadata 'outputs_ref'. Each output is stored once, gzip-compressed,
+in .notebook_outputs/ at the repo root, so the copies of the same lab under
+completed.ipynb/, module.0X/ and module.05/rev.02/ share their blobs.
+rehydrate puts the outputs back for viewing. A compacted notebook is still
+valid nbformat, so convert_ipynb_to_py and the patch scripts read it as-is,
+without parsing the base64 images.
+
+Usage:
+    python tools/notebook_outputs.py status    completed.ipynb module.04 module.05/rev.02
+    python tools/notebook_outputs.py compact   completed.ipynb module.04 module.05/rev.02
+    python tools/notebook_outputs.py rehydrate completed.ipynb module.04 module.05/rev.02
+"""
+from __future__ import annotations
+import sys
+import gzip
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from notebook_patch import find_notebooks, read_notebook, write_notebook
+
+DEFAULT_STORE = Path(__file__).resolve().parents[1] / '.notebook_outputs'
+REF_KEY = 'outputs_ref'
+MIN_BYTES = 1024
+
+
+def _canonical(output: dict) -> bytes:
+    return json.dumps(output, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _blob_path(store: Path, digest: str) -> Path:
+    return store / digest[:2] / f'{digest}.json.gz'
+
+
+def put_output(store: Path, output: dict) -> str:
+    data = _canonical(output)
+    digest = hashlib.sha256(data).hexdigest()
+    blob = _blob_path(store, digest)
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_suffix('.tmp')
+        tmp.write_bytes(gzip.compress(data, mtime=0))
+        tmp.replace(blob)
+    return digest
+
+
+def get_output(store: Path, digest: str) -> dict:
+    blob = _blob_path(store, digest)
+    if not blob.exists():
+        raise FileNotFoundError(f'Output {digest[:12]} is not in {store}')
+    return json.loads(gzip.decompress(blob.read_bytes()))
+
+
+def compact_notebook(nb: dict, store: Path, min_bytes: int = MIN_BYTES) -> int:
+    """Move large cell outputs of `nb` into `store`; returns the number of cells compacted."""
+    moved = 0
+    for cell in nb.get('cells', []):
+        outputs = cell.get('outputs')
+        if cell.get('cell_type') != 'code' or not outputs:
+            continue
+        if sum(len(_canonical(o)) for o in outputs) < min_bytes:
+            continue
+        # Refs of a previous compaction come first, in case outputs were added since
+        refs = cell.setdefault('metadata', {}).get(REF_KEY, [])
+        cell['metadata'][REF_KEY] = refs + [put_output(store, o) for o in outputs]
+        cell['outputs'] = []
+        moved += 1
+    return moved
+
+
+def rehydrate_notebook(nb: dict, store: Path) -> int:
+    """Put stored outputs back into `nb`; returns the number of cells restored."""
+    restored = 0
+    for cell in nb.get('cells', []):
+        refs = cell.get('metadata', {}).pop(REF_KEY, None)
+        if refs is None:
+            continue
+        cell['outputs'] = [get_output(store, d) for d in refs] + cell.get('outputs', [])
+        restored += 1
+    return restored
+
+
+def notebook_sizes(nb: dict) -> tuple[int, int]:
+    # (bytes of inline outputs, bytes of everything else)
+    outputs = sum(len(_canonical(o)) for c in nb.get('cells', []) for o in c.get('outputs', []))
+    return outputs, len(_canonical(nb)) - outputs
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['status', 'compact', 'rehydrate'])
+    parser.add_argument('paths', nargs='+', help='notebooks or directories')
+    parser.add_argument('--store', default=str(DEFAULT_STORE), help='output store directory')
+    parser.add_argument('--min-bytes', type=int, default=MIN_BYTES,
+                        help='leave cells whose outputs are smaller than this inline')
+    args = parser.parse_args(argv)
+
+    store = Path(args.store)
+    for path in find_notebooks(Path(p) for p in args.paths):
+        start = time.perf_counter()
+        try:
+            nb = read_notebook(path)
+        except ValueError as e:
+            print(f'Skipping {path}: not valid notebook JSON ({e})', file=sys.stderr)
+            continue
+        load_ms = (time.perf_counter() - start) * 1000
+        if args.command == 'status':
+            outputs, rest = notebook_sizes(nb)
+            refs = sum(len(c.get('metadata', {}).get(REF_KEY, [])) for c in nb.get('cells', []))
+            print(f'{path}: {path.stat().st_size / 1024:8.1f} KiB on disk, outputs {outputs / 1024:8.1f} KiB, '
+                  f'other {rest / 1024:7.1f} KiB, {refs} stored refs, load {load_ms:6.1f} ms')
+            continue
+        if args.command == 'compact':
+            count = compact_notebook(nb, store, args.min_bytes)
+        else:
+            count = rehydrate_notebook(nb, store)
+        if count:
+            before = path.stat().st_size
+            write_notebook(path, nb)
+            print(f'{path}: {args.command} {count} cells, {before / 1024:.1f} -> {path.stat().st_size / 1024:.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""Single-pass rule engine for patching course notebooks.
+
+A Rule names the literal snippets that identify a cell and the source that
+replaces it (None drops the cell). Every literal of every rule is compiled
+into one alternation regex, so each cell's source is scanned once. The rules
+whose literals all appeared are then checked in order and the first match
+wins. Notebooks are read and written as plain JSON, in nbformat's layout, and
+a notebook is only rewritten when some cell actually changed.
+
+A rules script defines RULES and NOTEBOOKS, the repo-relative glob patterns
+of the notebooks its rules are written for. The CLI applies each script's
+rules only to matching notebooks; a script without NOTEBOOKS applies to all.
+
+Usage:
+    python tools/notebook_patch.py --rules module.02/fill_edadataviz.py \
+        --rules module.03/patch_module03_notebook.py --dry-run .
+"""
+from __future__ import annotations
+import re
+import sys
+import fnmatch
+import json
+import time
+import argparse
+import importlib.util
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+MODES = ('contains', 'prefix', 'exact')
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    # Any one of these must appear in the cell ('prefix': start it, 'exact': be all of it)
+    triggers: tuple[str, ...]
+    replacement: Optional[str]
+    # Every one of these must appear as well
+    requires: tuple[str, ...] = ()
+    # At least one of these must appear as well
+    requires_any: tuple[str, ...] = ()
+    mode: str = 'contains'
+    cell_type: str = 'code'
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown rule mode {self.mode!r}; expected one of {MODES}")
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    rules: tuple[Rule, ...]
+    # Repo-relative glob patterns of the notebooks these rules target; empty matches any
+    notebooks: tuple[str, ...] = ()
+
+    def applies_to(self, path: Path) -> bool:
+        if not self.notebooks:
+            return True
+        resolved = Path(path).resolve()
+        rel = resolved.relative_to(REPO_ROOT).as_posix() if resolved.is_relative_to(REPO_ROOT) else resolved.as_posix()
+        return any(fnmatch.fnmatchcase(rel, pattern) for pattern in self.notebooks)
+
+
+@dataclass
+class Hit:
+    cell: int
+    rule: str
+    action: str  # 'replaced', 'dropped' or 'unchanged'
+
+
+@dataclass
+class PatchResult:
+    path: Path
+    nb: dict
+    hits: list[Hit] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return any(h.action != 'unchanged' for h in self.hits)
+
+
+def cell_source(cell: dict) -> str:
+    src = cell.get('source', '')
+    return ''.join(src) if isinstance(src, list) else src
+
+
+def read_notebook(path: Path) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_notebook(path: Path, nb: dict) -> None:
+    # Same layout as nbformat.write, so unchanged cells produce no diff
+    text = json.dumps(nb, sort_keys=True, indent=1, ensure_ascii=False)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text if text.endswith('\n') else text + '\n')
+
+
+class NotebookPatcher:
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        self._exact: dict[tuple[str, str], int] = {}
+        literals: set[str] = set()
+        for i, rule in enumerate(self.rules):
+            if rule.mode == 'exact':
+                for t in rule.triggers:
+                    self._exact.setdefault((rule.cell_type, t), i)
+            else:
+                literals.update(rule.triggers)
+            literals.update(rule.requires)
+            literals.update(rule.requires_any)
+        # Longest first inside a zero-width lookahead: matches may overlap, and a literal
+        # that is a prefix of a longer one at the same offset is implied by it
+        ordered = sorted(literals, key=len, reverse=True)
+        self._implied = {a: [b for b in ordered if b != a and a.startswith(b)] for a in ordered}
+        self._matcher = re.compile('(?=(' + '|'.join(re.escape(s) for s in ordered) + '))') if ordered else None
+
+    def _scan(self, src: str) -> dict[str, int]:
+        # First offset of every literal found in `src`
+        found: dict[str, int] = {}
+        if self._matcher is None:
+            return found
+        for m in self._matcher.finditer(src):
+            pos = m.start()
+            for lit in (m.group(1), *self._implied[m.group(1)]):
+                if lit not in found:
+                    found[lit] = pos
+        return found
+
+    def match(self, cell: dict) -> Optional[Rule]:
+        cell_type = cell.get('cell_type')
+        src = cell_source(cell)
+        stripped = src.strip()
+        exact = self._exact.get((cell_type, stripped))
+        found = self._scan(src)
+        start = len(src) - len(src.lstrip())
+        for i, rule in enumerate(self.rules):
+            if rule.cell_type != cell_type:
+                continue
+            if rule.mode == 'exact':
+                if exact != i:
+                    continue
+            elif rule.mode == 'prefix':
+                if not any(found.get(t) == start for t in rule.triggers):
+                    continue
+            elif not any(t in found for t in rule.triggers):
+                continue
+            if all(r in found for r in rule.requires) and (
+                    not rule.requires_any or any(r in found for r in rule.requires_any)):
+                return rule
+        return None
+
+    def patch(self, path: Path) -> PatchResult:
+        """Apply the rules to the notebook at `path` in memory."""
+        nb = read_notebook(path)
+        result = PatchResult(Path(path), nb)
+        cells = []
+        for i, cell in enumerate(nb.get('cells', [])):
+            rule = self.match(cell)
+            if rule is None:
+                cells.append(cell)
+                continue
+            if rule.replacement is None:
+                result.hits.append(Hit(i, rule.name, 'dropped'))
+                continue
+            if cell_source(cell) == rule.replacement:
+                result.hits.append(Hit(i, rule.name, 'unchanged'))
+            else:
+                cell['source'] = rule.replacement.splitlines(keepends=True)
+                result.hits.append(Hit(i, rule.name, 'replaced'))
+            cells.append(cell)
+        nb['cells'] = cells
+        return result
+
+    def patch_many(self, paths: Iterable[Path], write: bool = True) -> list[PatchResult]:
+        results = []
+        for path in paths:
+            try:
+                result = self.patch(path)
+            except ValueError as e:
+                # e.g. module.05/rev.02/edadataviz.ipynb is truncated; nbformat rejects it too
+                print(f'Skipping {path}: not valid notebook JSON ({e})', file=sys.stderr)
+                continue
+            if write and result.changed:
+                write_notebook(result.path, result.nb)
+            results.append(result)
+        return results
+
+
+def find_notebooks(roots: Iterable[Path]) -> list[Path]:
+    paths: list[Path] = []
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            paths.append(root)
+            continue
+        for p in sorted(root.rglob('*.ipynb')):
+            # completed.ipynb/ is a directory despite its name
+            if not p.is_file() or '.ipynb_checkpoints' in p.parts or '.backup' in p.name:
+                continue
+            paths.append(p)
+    return paths
+
+
+def format_report(results: list[PatchResult], show_unchanged: bool = False) -> list[str]:
+    lines = []
+    for result in results:
+        hits = [h for h in result.hits if show_unchanged or h.action != 'unchanged']
+        if not hits:
+            continue
+        lines.append(f'{result.path}{"" if result.changed else " (already patched)"}')
+        for h in hits:
+            lines.append(f'  cell {h.cell:3d}  {h.action:9s}  {h.rule}')
+    return lines
+
+
+def load_rules(script: Path) -> RuleSet:
+    """The RULES and NOTEBOOKS defined by a patch script, without running its main()."""
+    spec = importlib.util.spec_from_file_location(f'_rules_{Path(script).stem}', script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return RuleSet(tuple(module.RULES), tuple(getattr(module, 'NOTEBOOKS', ())))
+
+
+def patch_scoped(rule_sets: list[RuleSet], paths: Iterable[Path], write: bool = True) -> list[PatchResult]:
+    """Patch each notebook with the rule sets that target it, earlier sets taking priority."""
+    patchers: dict[tuple[int, ...], NotebookPatcher] = {}
+    results = []
+    for path in paths:
+        key = tuple(i for i, rule_set in enumerate(rule_sets) if rule_set.applies_to(path))
+        if not key:
+            continue
+        patcher = patchers.get(key)
+        if patcher is None:
+            patcher = patchers[key] = NotebookPatcher(r for i in key for r in rule_sets[i].rules)
+        results.extend(patcher.patch_many([path], write=write))
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', default=['.'], help='notebooks or directories to patch')
+    parser.add_argument('--rules', action='append', required=True,
+                        help='patch script defining RULES (repeatable; earlier scripts take priority)')
+    parser.add_argument('--dry-run', action='store_true', help='report matches without writing')
+    args = parser.parse_args(argv)
+
+    rule_sets = [load_rules(Path(script)) for script in args.rules]
+    rules = [r for rule_set in rule_sets for r in rule_set.rules]
+    start = time.perf_counter()
+    notebooks = find_notebooks(Path(p) for p in args.paths)
+    results = patch_scoped(rule_sets, notebooks, write=not args.dry_run)
+    elapsed = (time.perf_counter() - start) * 1000
+    for line in format_report(results):
+        print(line)
+    changed = sum(r.changed for r in results)
+    verb = 'would change' if args.dry_run else 'changed'
+    print(f'{len(notebooks)} notebooks ({len(results)} targeted), {len(rules)} rules, '
+          f'{changed} {verb} in {elapsed:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()